@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
 
+import argparse
 import importlib
 import os
 import random
+import sys
 
 from collections import defaultdict
 
+# profiling.py lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import profiling
+from profiling import phase, timed
+
 # simulates a single english auction with a set of strategies
+@timed('auction.clear')
 def simulate_english(strategies):
     base_value = random.randint(100, 200)
     str_values = {strat.name() : base_value + random.randint(-50, 50) 
@@ -29,6 +38,7 @@ def simulate_english(strategies):
     return None, 0, 0
 
 # simulates a single dutch auction with a set of strategies
+@timed('auction.clear')
 def simulate_dutch(strategies):
 
     base_value = random.randint(100, 200)
@@ -43,7 +53,7 @@ def simulate_dutch(strategies):
         active_strategies = {s for s in strategies 
                                if s.interested(current_price, 0)}
         if active_strategies:
-            winner = random.sample(sorted(active_strategies), 1)[0]
+            winner = random.sample(sorted(active_strategies, key=lambda s: s.name()), 1)[0]
             return winner, str_values[winner.name()] - current_price, current_price
 
     return None, 0, 0
@@ -83,12 +93,17 @@ def simulate_multiple(strategies, auction_type='english', count=100):
 
 if __name__ == '__main__':
 
+    parser = argparse.ArgumentParser(description='Run English and Dutch auction tournaments.')
+    profiling.add_profile_argument(parser)
+    profiling.enable_from_args(parser.parse_args())
+
     strat_modules = []
 
-    for f in os.listdir('strategies'):
-        module_name = '.'.join(f.split('.')[:-1])
-        if (module_name): # skips directories and files without '.'
-            strat_modules.append(importlib.import_module(f'strategies.{module_name}'))
+    with phase('auction.load_strategies'):
+        for f in os.listdir('strategies'):
+            module_name = '.'.join(f.split('.')[:-1])
+            if (module_name): # skips directories and files without '.'
+                strat_modules.append(importlib.import_module(f'strategies.{module_name}'))
             
     strat_modules = [m for m in strat_modules if "sincere" in m.__name__.lower()]
 
@@ -97,6 +112,11 @@ if __name__ == '__main__':
     strategies_english = [m.strategy_ascending(num_strategies) for m in strat_modules]
     strategies_dutch = [m.strategy_descending(num_strategies) for m in strat_modules]
 
+    if profiling.enabled():
+        # time strategy calls separately; instances are only wrapped when profiling
+        for s in strategies_english + strategies_dutch:
+            s.interested = timed('strategy.interested')(s.interested)
+
     profits_english = simulate_multiple(strategies_english, 'english')
     profits_dutch = simulate_multiple(strategies_dutch, 'dutch')
 
@@ -0,0 +1,131 @@
+import importlib
+import multiprocessing
+import time
+
+try:
+    import resource  # POSIX only; without it the memory limit is not applied
+except ImportError:
+    resource = None
+
+# runs one strategy in a worker process. The parent sends batches of
+# (method, args) calls and gets back ('ok', result of the last call) or
+# ('error', message); None ends the worker.
+def _worker(conn, module_name, factory_name, num_strategies, memory_mb):
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    failure = None
+    try:
+        strategy = getattr(importlib.import_module(module_name), factory_name)(num_strategies)
+    except Exception as error:
+        failure = f'could not create the strategy: {type(error).__name__}: {error}'
+
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            return
+        if batch is None:
+            return
+        if failure:
+            conn.send(('error', failure))
+            continue
+        try:
+            for method, args in batch:
+                result = getattr(strategy, method)(*args)
+            conn.send(('ok', result))
+        except Exception as error:  # MemoryError included
+            conn.send(('error', f'{method}() raised {type(error).__name__}: {error}'))
+
+# stands in for a strategy that runs in its own process. Calls whose result
+# the auctions ignore (set_num_auctions, set_money, won, set_value) are queued
+# and sent together with the next call that needs an answer, so an auction
+# round costs one round trip per strategy.
+#
+# A strategy is disqualified when a call takes longer than call_timeout
+# seconds, when its calls since start_auction() take longer than
+# auction_timeout seconds in total, when it raises, or when its worker dies
+# (for instance on hitting memory_mb). From then on it is not interested in
+# anything and `disqualified` holds the reason; simulate_multiple() removes
+# it like a bankrupt strategy.
+class SandboxedStrategy:
+
+    def __init__(self, module_name, factory_name, num_strategies,
+                 call_timeout=0.1, auction_timeout=2.0, memory_mb=512, startup_timeout=10.0):
+        self.call_timeout = call_timeout
+        self.auction_timeout = auction_timeout
+        self.disqualified = None
+        self.auction_time = 0.0
+        self._pending = []
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_worker, args=(child_conn, module_name, factory_name, num_strategies, memory_mb),
+            daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._name = self._call('name', timeout=startup_timeout) or module_name
+
+    def _disqualify(self, reason):
+        self.disqualified = reason
+        self._pending = []
+        self._process.kill()
+        return None
+
+    def _call(self, method, *args, timeout=None):
+        if self.disqualified:
+            return None
+        batch, self._pending = self._pending + [(method, args)], []
+        start = time.perf_counter()
+        try:
+            self._conn.send(batch)
+            if not self._conn.poll(timeout or self.call_timeout):
+                return self._disqualify(f'{method}() did not answer within {timeout or self.call_timeout}s')
+            status, result = self._conn.recv()
+        except (EOFError, OSError):
+            return self._disqualify(f'worker process died during {method}()')
+        self.auction_time += time.perf_counter() - start
+        if status == 'error':
+            return self._disqualify(result)
+        if self.auction_time > self.auction_timeout:
+            return self._disqualify(f'used more than {self.auction_timeout}s in one auction')
+        return result
+
+    def _send_later(self, method, *args):
+        if not self.disqualified:
+            self._pending.append((method, args))
+
+    def start_auction(self):
+        self.auction_time = 0.0
+
+    def name(self):
+        return self._name
+
+    def author(self):
+        return self._call('author')
+
+    def set_num_auctions(self, num_auctions):
+        self._send_later('set_num_auctions', num_auctions)
+
+    def set_money(self, money):
+        self._send_later('set_money', money)
+
+    def won(self, price):
+        self._send_later('won', price)
+
+    def set_value(self, value):
+        self._send_later('set_value', value)
+
+    def interested(self, price, active_strats):
+        return bool(self._call('interested', price, active_strats))
+
+    def close(self):
+        if self._process.is_alive():
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            self._process.join(1.0)
+            if self._process.is_alive():
+                self._process.kill()
+        self._conn.close()
@@ -1,20 +1,124 @@
+import argparse
+import gzip
 import importlib
 import os
+import pickle
 import random
+import sys
 
 from collections import defaultdict
 
+# profiling.py lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+from profiling import phase, timed
+from sandbox import SandboxedStrategy
+
+# price clock bounds: english auctions run from MIN_PRICE up to MAX_PRICE - 1,
+# dutch auctions from MAX_PRICE down to MIN_PRICE + 1
+MIN_PRICE = 10
+MAX_PRICE = 300
+
+# value distribution: a common base value plus a private offset per strategy;
+# `settings` describes the distribution in checkpoints
+def uniform_values(low=100, high=200, spread=50):
+    def draw(strategies):
+        base_value = random.randint(low, high)
+        return {strat.name() : base_value + random.randint(-spread, spread)
+                for strat in strategies}
+    draw.settings = ('uniform', low, high, spread)
+    return draw
+
+def interested_set(strategies, price, act_count):
+    return {s for s in strategies if s.interested(price, act_count)}
+
+# adaptive english clock: while the set of interested strategies stays the
+# same, the unit clock keeps asking with the same active count, so gallop
+# upwards with that count, then bisect for the first price where the set
+# changes. Repeat from there with the new count until at most one strategy
+# is left. Same result as the unit clock (prices and active counts) for
+# strategies whose interest at a given count never comes back once lost,
+# with O(log(price range)) queries per drop-out.
+def english_adaptive(strategies, low, high):
+    if low >= high:
+        return None, set()  # empty price range: no sale
+    price = low
+    active = interested_set(strategies, price, len(strategies))
+    while len(active) >= 2:
+        count = len(active)
+        lo, step = price, 1
+        while True:
+            if lo == high - 1:
+                return None, active  # clock ran out with several bidders left
+            probe = min(lo + step, high - 1)
+            probed = interested_set(strategies, probe, count)
+            if probed == active:
+                lo = probe
+                step *= 2
+            else:
+                hi, changed = probe, probed
+                break
+
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            probed = interested_set(strategies, mid, count)
+            if probed == active:
+                lo = mid
+            else:
+                hi, changed = mid, probed
+        price, active = hi, changed
+    return price, active
+
+# adaptive dutch clock: gallop downwards while nobody is interested, then
+# bisect for the highest price somebody accepts
+def dutch_adaptive(strategies, low, high):
+    if high <= low:
+        return None, set()  # empty price range: no sale
+    hi = high
+    accepted = interested_set(strategies, hi, 0)
+    if accepted:
+        return hi, accepted
+
+    step = 1
+    while True:
+        if hi == low + 1:
+            return None, accepted
+        probe = max(hi - step, low + 1)
+        probed = interested_set(strategies, probe, 0)
+        if probed:
+            lo, accepted = probe, probed
+            break
+        hi = probe
+        step *= 2
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        probed = interested_set(strategies, mid, 0)
+        if probed:
+            lo, accepted = mid, probed
+        else:
+            hi = mid
+    return lo, accepted
+
 # simulates a single english auction with a set of strategies
-def simulate_english(strategies):
-    base_value = random.randint(100, 200)
-    str_values = {strat.name() : base_value + random.randint(-50, 50) 
-                    for strat in strategies}
+@timed('auction.clear')
+def simulate_english(strategies, prices=(MIN_PRICE, MAX_PRICE), values=None, clock='unit'):
+    str_values = (values or uniform_values())(strategies)
     
     for s in strategies:
         s.set_value(str_values[s.name()])
 
+    low, high = prices
+    if clock == 'adaptive':
+        current_price, active_strategies = english_adaptive(strategies, low, high)
+        if current_price is None or len(active_strategies) == 0:
+            return None, 0, 0
+        winner = next(iter(active_strategies))
+        return winner, str_values[winner.name()] - current_price, current_price
+
     active_strategies = set(strategies)
-    for current_price in range(10, 300):
+    for current_price in range(low, high):
         act_count = len(active_strategies)
         active_strategies = {s for s in strategies 
                                if s.interested(current_price, act_count)}
@@ -27,52 +131,276 @@ def simulate_english(strategies):
     return None, 0, 0
 
 # simulates a single dutch auction with a set of strategies
-def simulate_dutch(strategies):
+@timed('auction.clear')
+def simulate_dutch(strategies, prices=(MIN_PRICE, MAX_PRICE), values=None, clock='unit'):
 
-    base_value = random.randint(100, 200)
-    str_values = {strat.name() : base_value + random.randint(-50, 50) 
-                    for strat in strategies}
+    str_values = (values or uniform_values())(strategies)
     
     for s in strategies:
         s.set_value(str_values[s.name()])
 
+    low, high = prices
+    if clock == 'adaptive':
+        current_price, active_strategies = dutch_adaptive(strategies, low, high)
+        if current_price is None:
+            return None, 0, 0
+        winner = random.sample(sorted(active_strategies, key=lambda s: s.name()), 1)[0]
+        return winner, str_values[winner.name()] - current_price, current_price
+
     active_strategies = set(strategies)
-    for current_price in range(300, 10, -1):
+    for current_price in range(high, low, -1):
         active_strategies = {s for s in strategies 
                                if s.interested(current_price, 0)}
         if active_strategies:
-            winner = random.sample(sorted(active_strategies), 1)[0]
+            winner = random.sample(sorted(active_strategies, key=lambda s: s.name()), 1)[0]
             return winner, str_values[winner.name()] - current_price, current_price
 
     return None, 0, 0
 
-# simulates multiple auctions
-def simulate_multiple(strategies, auction_type='english', count=100):
+# bidder used by check_clocks(): its limit moves by `premium` for every
+# other active strategy, so its answers depend on the active count
+class CountSensitiveBidder:
+
+    def __init__(self, index, premium):
+        self.index = index
+        self.premium = premium
+        self.remaining_money = 1000
+        self.value = 0
+
+    def name(self):
+        return f'Count Sensitive Bidder {self.index}'
+
+    def set_value(self, value):
+        self.value = value
+
+    def interested(self, price, active_strats):
+        limit = self.value + self.premium * (max(active_strats, 1) - 1)
+        return price <= limit and price <= self.remaining_money
+
+# runs the same auctions on the unit and the adaptive clock, with bidders
+# whose interest depends on the active count and with narrow and empty price
+# ranges; returns the number of auctions whose (winner, profit, price) differ
+def check_clocks(trials=300, seed=0):
+    rng = random.Random(seed)
+    mismatches = 0
+    for trial in range(trials):
+        strategies = [CountSensitiveBidder(i, rng.choice([-15, -5, 0, 5, 15]))
+                      for i in range(rng.randint(2, 8))]
+        prices = rng.choice([(MIN_PRICE, MAX_PRICE), (150, 160), (150, 151), (150, 150), (200, 100)])
+        for auc_fn in (simulate_english, simulate_dutch):
+            results = []
+            for clock in ('unit', 'adaptive'):
+                random.seed(seed * 1000003 + trial)
+                winner, profit, price = auc_fn(strategies, prices, clock=clock)
+                results.append((winner and winner.name(), profit, price))
+            if results[0] != results[1]:
+                mismatches += 1
+                print(f'{auc_fn.__name__} trial {trial}, prices {prices}: unit {results[0]}, adaptive {results[1]}')
+    return mismatches
+
+# runs one simultaneous auction of two items with strategies.focused bidding
+# natively and through LegacyBidder. With money for one item only, the
+# adapter keeps the more valuable, contested item and is outbid on it; the
+# native demand() keeps the less contested one and wins it. Returns the
+# sales of both runs as (winner, profit, price) with the winner's name
+def check_native_demand():
+    from strategies.focused import FocusedStrategy
+    values = [{'Focused Strategy': 200, 'Count Sensitive Bidder 0': 190, 'Count Sensitive Bidder 1': 195},
+              {'Focused Strategy': 180, 'Count Sensitive Bidder 0': 100, 'Count Sensitive Bidder 1': 0}]
+    results = []
+    for wrap in (lambda s: s, LegacyBidder):
+        focused = FocusedStrategy(3)
+        focused.set_money(150)
+        strategies = [wrap(focused), CountSensitiveBidder(0, 0), CountSensitiveBidder(1, 0)]
+        draws = iter(values)
+        money = {s.name(): 1000 for s in strategies}
+        money['Focused Strategy'] = 150
+        sales = simulate_simultaneous(strategies, items=2, values=lambda strategies: next(draws), money=money)
+        results.append([(winner and winner.name(), profit, price) for winner, profit, price in sales])
+    return results
+
+# strategies written for single-item auctions take part in simultaneous
+# auctions through this adapter: it answers a demand query by asking
+# interested() item by item, with the value of that item set first
+class LegacyBidder:
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.values = {}
+
+    def name(self):
+        return self.strategy.name()
+
+    def set_values(self, values):
+        self.values = values
+
+    def demand(self, prices, active_counts):
+        wanted = set()
+        for item, price in prices.items():
+            self.strategy.set_value(self.values[item])
+            if self.strategy.interested(price, active_counts[item]):
+                wanted.add(item)
+        return wanted
+
+def bidder_for(strategy):
+    return strategy if hasattr(strategy, 'demand') else LegacyBidder(strategy)
+
+# simulates a simultaneous ascending auction of `items` items on one price
+# clock. Every round each strategy is asked once for its demand set: the
+# items it still bids on at the current price (a strategy that drops an item
+# cannot come back to it). An item is sold as in simulate_english, to the
+# last bidder left, at the price where it was left alone. Demand sets are cut
+# to what the strategy can pay for out of `money` (name -> money, unlimited
+# if None), keeping its most valuable items. Returns (winner, profit, price)
+# for every item.
+@timed('auction.clear')
+def simulate_simultaneous(strategies, items=5, prices=(MIN_PRICE, MAX_PRICE), values=None, money=None):
+    draw = values or uniform_values()
+    item_values = [draw(strategies) for _ in range(items)]
+    budget = {s.name() : money[s.name()] if money else float('inf') for s in strategies}
+
+    bidders = {}
+    for s in strategies:
+        bidders[s] = bidder_for(s)
+        bidders[s].set_values({item: item_values[item][s.name()] for item in range(items)})
+
+    sales = [(None, 0, 0)] * items
+    active = {item: set(strategies) for item in range(items)}  # open items -> bidders left
+    bidding_on = {s: set(range(items)) for s in strategies}    # strategy -> open items it is in
+    low, high = prices
+    for current_price in range(low, high):
+        if not active:
+            break
+        act_counts = {item: len(bidding) for item, bidding in active.items()}
+        demanded = {item: set() for item in active}
+        for s, bidder in bidders.items():
+            offered = bidding_on[s]
+            if not offered:
+                continue
+            wanted = offered.intersection(bidder.demand(dict.fromkeys(offered, current_price),
+                                                        {item: act_counts[item] for item in offered}))
+            name = s.name()
+            if len(wanted) * current_price > budget[name]:
+                affordable = int(budget[name] // current_price)
+                wanted = set(sorted(wanted, key=lambda item: item_values[item][name], reverse=True)[:affordable])
+            bidding_on[s] = wanted
+            for item in wanted:
+                demanded[item].add(s)
+
+        for item, bidding in demanded.items():
+            if len(bidding) == 1:
+                winner = next(iter(bidding))
+                sales[item] = (winner, item_values[item][winner.name()] - current_price, current_price)
+                budget[winner.name()] -= current_price
+                bidding_on[winner].discard(item)
+                del active[item]
+            elif len(bidding) == 0:
+                del active[item]
+            else:
+                active[item] = bidding
+
+    return sales
+
+# sandboxed strategies that broke a limit (see sandbox.py) are removed the
+# same way as bankrupt ones
+def remove_disqualified(strategies, str_profits):
+    for s in list(strategies):
+        if getattr(s, 'disqualified', None):
+            print(f'{s.name()} disqualified: {s.disqualified}')
+            str_profits[s.name()] = -1000000
+            strategies.remove(s)
+
+# writes the engine state, the RNG state and the surviving strategies to a
+# compressed checkpoint; the file is replaced atomically
+def save_checkpoint(path, state):
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    with gzip.open(path, 'rb') as f:
+        return pickle.load(f)
+
+# everything besides the strategies that decides the results of a tournament;
+# a checkpoint is only resumed with the same settings
+def tournament_settings(auction_type, count, money, auction_options):
+    settings = dict(auction_options, auction_type=auction_type, count=count, money=money)
+    values = settings.get('values') or uniform_values()
+    name = getattr(values, '__qualname__', type(values).__qualname__)
+    settings['values'] = getattr(values, 'settings', f'{values.__module__}.{name}')
+    if 'prices' in settings:
+        settings['prices'] = tuple(settings['prices'])
+    return settings
+
+# simulates multiple auctions; auction_options (prices, values, clock, or
+# items for simultaneous auctions) are passed on to every single auction.
+# A simultaneous auction sells several items, each counted as one auction
+# in set_num_auctions(). With a checkpoint file the state is
+# saved every checkpoint_every auctions, and resume=True continues from it.
+def simulate_multiple(strategies, auction_type='english', count=100, money=1000,
+                      checkpoint=None, checkpoint_every=10, resume=False, **auction_options):
 
     if auction_type == 'english':
         auc_fn = simulate_english
     elif auction_type == 'dutch':
         auc_fn = simulate_dutch
+    elif auction_type == 'simultaneous':
+        auc_fn = simulate_simultaneous
+    items = auction_options.get('items', 5) if auction_type == 'simultaneous' else 1
 
-    str_money = {strat.name() : 1000 for strat in strategies}
-    for s in strategies:
-        s.set_num_auctions(count)
-        s.set_money(str_money[s.name()])
-
-    str_profits = defaultdict(int)
-
-    for _ in range(count):
-        winner, profit, price = auc_fn(strategies)
-        if not winner:
-            continue
-        # uncomment the line below to see all the sales
-        # print(f'{winner.name()} won for profit {profit} paying {price}')
-        winner.won(price)
-        str_money[winner.name()] -= price
-        str_profits[winner.name()] += profit + price
-        if (str_money[winner.name()] < 0):
-            str_profits[winner.name()] = -1000000  # winner did not have money to pay
-            strategies.remove(winner)
+    settings = tournament_settings(auction_type, count, money, auction_options)
+    if resume and checkpoint and os.path.exists(checkpoint):
+        state = load_checkpoint(checkpoint)
+        saved = state.get('settings', {})
+        if saved != settings:
+            changed = ', '.join(f'{key} {saved.get(key)!r} -> {settings.get(key)!r}'
+                                for key in sorted(set(saved) | set(settings)) if saved.get(key) != settings.get(key))
+            raise ValueError(f'{checkpoint} was written with other settings ({changed})')
+        strategies[:] = state['strategies']
+        str_money = state['str_money']
+        str_profits = state['str_profits']
+        first = state['done']
+        random.setstate(state['rng'])
+    else:
+        str_money = {strat.name() : money for strat in strategies}
+        for s in strategies:
+            s.set_num_auctions(count * items)
+            s.set_money(str_money[s.name()])
+
+        str_profits = defaultdict(int)
+        first = 0
+
+    for done in range(first + 1, count + 1):
+        for s in strategies:
+            if hasattr(s, 'start_auction'):
+                s.start_auction()
+        if auction_type == 'simultaneous':
+            sales = auc_fn(strategies, money=str_money, **auction_options)
+        else:
+            sales = [auc_fn(strategies, **auction_options)]
+        for winner, profit, price in sales:
+            if not winner:
+                continue
+            # uncomment the line below to see all the sales
+            # print(f'{winner.name()} won for profit {profit} paying {price}')
+            winner.won(price)
+            str_money[winner.name()] -= price
+            str_profits[winner.name()] += profit + price
+            if (str_money[winner.name()] < 0):
+                str_profits[winner.name()] = -1000000  # winner did not have money to pay
+                strategies.remove(winner)
+        remove_disqualified(strategies, str_profits)
+
+        if checkpoint and (done % checkpoint_every == 0 or done == count):
+            save_checkpoint(checkpoint, {
+                'settings': settings,
+                'done': done,
+                'str_money': str_money,
+                'str_profits': str_profits,
+                'strategies': strategies,
+                'rng': random.getstate(),
+            })
 
     for s in strategies:
         str_profits[s.name()] += str_money[s.name()]
@@ -81,20 +409,107 @@ def simulate_multiple(strategies, auction_type='english', count=100):
 
 if __name__ == '__main__':
 
+    parser = argparse.ArgumentParser(description='Run English and Dutch auction tournaments.')
+    parser.add_argument('--clock', choices=['unit', 'adaptive'], default='unit',
+                        help='unit-step price clock, or adaptive steps for wide price ranges')
+    parser.add_argument('--prices', nargs=2, type=int, default=[MIN_PRICE, MAX_PRICE], metavar=('MIN', 'MAX'),
+                        help='price clock bounds')
+    parser.add_argument('--values', nargs=3, type=int, default=[100, 200, 50], metavar=('LOW', 'HIGH', 'SPREAD'),
+                        help='base values drawn from LOW..HIGH, plus or minus SPREAD per strategy')
+    parser.add_argument('--money', type=int, default=1000, help='starting money of every strategy')
+    parser.add_argument('--count', type=int, default=100, help='number of auctions of each type')
+    parser.add_argument('--seed', type=int, help='seed of the random number generator')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='save the tournament state to FILE.english / FILE.dutch while running')
+    parser.add_argument('--checkpoint-every', type=int, default=10, metavar='K',
+                        help='auctions between checkpoints (default 10)')
+    parser.add_argument('--resume', action='store_true', help='continue from the checkpoint files')
+    parser.add_argument('--items', type=int, default=0, metavar='M',
+                        help='also run simultaneous ascending auctions of M items each')
+    parser.add_argument('--check-clocks', action='store_true',
+                        help='check that the adaptive clock sells like the unit clock, then exit')
+    parser.add_argument('--check-demand', action='store_true',
+                        help='check that a native demand() strategy bids differently than through the adapter, then exit')
+    parser.add_argument('--sandbox', action='store_true',
+                        help='run every strategy in its own process with time and memory limits')
+    parser.add_argument('--call-timeout', type=float, default=0.1, metavar='SECONDS',
+                        help='sandbox: longest a single strategy call may take')
+    parser.add_argument('--auction-timeout', type=float, default=2.0, metavar='SECONDS',
+                        help='sandbox: total time a strategy may take in one auction')
+    parser.add_argument('--memory-mb', type=int, default=512,
+                        help='sandbox: address space limit of each strategy process')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+    profiling.enable_from_args(args)
+    if args.sandbox and args.checkpoint:
+        parser.error('--sandbox cannot be combined with --checkpoint (worker processes cannot be saved)')
+
+    if args.check_clocks:
+        mismatches = check_clocks(seed=args.seed or 0)
+        print(f'{mismatches} auctions differ between the unit and the adaptive clock')
+        sys.exit(1 if mismatches else 0)
+
+    if args.check_demand:
+        native, adapted = check_native_demand()
+        print(f'native demand(): {native}\nLegacyBidder:    {adapted}')
+        expected = ([('Count Sensitive Bidder 1', 4, 191), ('Focused Strategy', 79, 101)],
+                    [('Count Sensitive Bidder 1', 4, 191), ('Count Sensitive Bidder 0', 24, 76)])
+        sys.exit(0 if (native, adapted) == expected else 1)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    auction_options = {
+        'prices': tuple(args.prices),
+        'values': uniform_values(*args.values),
+        'clock': args.clock,
+    }
+
     strat_modules = []
 
-    for f in os.listdir('strategies'):
-        module_name = '.'.join(f.split('.')[:-1])
-        if (module_name): # skips directories and files without '.'
-            strat_modules.append(importlib.import_module(f'strategies.{module_name}'))
+    with phase('auction.load_strategies'):
+        for f in os.listdir('strategies'):
+            module_name = '.'.join(f.split('.')[:-1])
+            if (module_name): # skips directories and files without '.'
+                strat_modules.append(importlib.import_module(f'strategies.{module_name}'))
 
     num_strategies = len(strat_modules)
 
-    strategies_english = [m.strategy_ascending(num_strategies) for m in strat_modules]
-    strategies_dutch = [m.strategy_descending(num_strategies) for m in strat_modules]
+    if args.sandbox:
+        def load(factory_name):
+            return [SandboxedStrategy(m.__name__, factory_name, num_strategies, args.call_timeout,
+                                      args.auction_timeout, args.memory_mb) for m in strat_modules]
+    else:
+        def load(factory_name):
+            return [getattr(m, factory_name)(num_strategies) for m in strat_modules]
+
+    strategies_english = load('strategy_ascending')
+    strategies_dutch = load('strategy_descending')
+    strategies_simultaneous = load('strategy_ascending') if args.items else []
+    all_strategies = strategies_english + strategies_dutch + strategies_simultaneous
 
-    profits_english = simulate_multiple(strategies_english, 'english')
-    profits_dutch = simulate_multiple(strategies_dutch, 'dutch')
+    if profiling.enabled() and not args.checkpoint:
+        # time strategy calls separately; instances are only wrapped when
+        # profiling (the wrappers cannot be pickled into a checkpoint)
+        for s in all_strategies:
+            s.interested = timed('strategy.interested')(s.interested)
+
+    def tournament_options(auction_type):
+        checkpoint = f'{args.checkpoint}.{auction_type}' if args.checkpoint else None
+        return dict(auction_options, count=args.count, money=args.money, checkpoint=checkpoint,
+                    checkpoint_every=args.checkpoint_every, resume=args.resume)
+
+    profits_english = simulate_multiple(strategies_english, 'english', **tournament_options('english'))
+    profits_dutch = simulate_multiple(strategies_dutch, 'dutch', **tournament_options('dutch'))
+    if args.items:
+        simultaneous_options = tournament_options('simultaneous')
+        del simultaneous_options['clock']  # the shared clock always moves in unit steps
+        profits_simultaneous = simulate_multiple(strategies_simultaneous, 'simultaneous',
+                                                 items=args.items, **simultaneous_options)
+
+    if args.sandbox:
+        for s in all_strategies:
+            s.close()
 
     score_board_english = sorted([(k, v) for k, v in profits_english.items()], key=lambda x: x[1], reverse=True)
     score_board_dutch = sorted([(k, v) for k, v in profits_dutch.items()], key=lambda x: x[1], reverse=True)
@@ -109,3 +524,12 @@ if __name__ == '__main__':
 
     for name, score in score_board_dutch:
         print(f'\t\t{name:40} {score}')
+
+    if args.items:
+        score_board_simultaneous = sorted(profits_simultaneous.items(), key=lambda x: x[1], reverse=True)
+
+        print('\n')
+        print('*'*24, f' Simultaneous Auction ({args.items} items) ', '*'*24)
+
+        for name, score in score_board_simultaneous:
+            print(f'\t\t{name:40} {score}')
@@ -1,10 +1,14 @@
 class AggressiveCombinedStrategy:
 
-    def __init__(self, num_strategies, auction_type="ascending"):
+    def __init__(self, num_strategies, auction_type="ascending", multiplier=None):
         self.num_strategies = num_strategies
         self.remaining_money = 0
         self.num_auctions = 0
         self.auction_type = auction_type  # Either "ascending" or "descending"
+        # highest price as a multiple of the value: 1.2 ascending, 1.1 descending by default
+        if multiplier is None:
+            multiplier = 1.2 if auction_type == "ascending" else 1.1
+        self.multiplier = multiplier
 
     # name of the strategy - make sure it is unique
     def name(self):
@@ -33,19 +37,19 @@ class AggressiveCombinedStrategy:
     # shows interest in the object for the current price, called in each iteration of each auction
     def interested(self, price, active_strats):
         if self.auction_type == "ascending":
-            # Ascending auction: allow bidding up to 20% above value
-            aggressive_value = self.value * 1.2
+            # Ascending auction: allow bidding up to multiplier x value (20% above by default)
+            aggressive_value = self.value * self.multiplier
             return price <= aggressive_value and price <= self.remaining_money
         elif self.auction_type == "descending":
-            # Descending auction: bid if price is at or below 110% of value
-            aggressive_threshold = self.value * 1.1
+            # Descending auction: bid if price is at or below multiplier x value (110% by default)
+            aggressive_threshold = self.value * self.multiplier
             return price <= aggressive_threshold and price <= self.remaining_money
         else:
             raise ValueError("Invalid auction type. Must be 'ascending' or 'descending'.")
 
 # Factory functions for each type of auction strategy
-def strategy_ascending(num_strategies):
-    return AggressiveCombinedStrategy(num_strategies, auction_type="ascending")
+def strategy_ascending(num_strategies, multiplier=1.2):
+    return AggressiveCombinedStrategy(num_strategies, auction_type="ascending", multiplier=multiplier)
 
-def strategy_descending(num_strategies):
-    return AggressiveCombinedStrategy(num_strategies, auction_type="descending")
+def strategy_descending(num_strategies, multiplier=1.1):
+    return AggressiveCombinedStrategy(num_strategies, auction_type="descending", multiplier=multiplier)
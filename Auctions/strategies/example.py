@@ -25,8 +25,7 @@ class ExampleStrategy:
     def won(self, price):
         self.remaining_money -= price
 
-    # ls -lah
-     of the object for this agent - called before every auction
+    # value of the object for this agent - called before every auction
     def set_value(self, value): 
         self.value = value
 
@@ -0,0 +1,62 @@
+class FocusedStrategy:
+
+    def __init__(self, num_strategies):
+        self.num_strategies = num_strategies
+        self.remaining_money = 0
+        self.num_auctions = 0
+        self.value = 0
+        self.values = {}
+
+    # name of the strategy - make sure it is unique
+    def name(self):
+        return "Focused Strategy"
+
+    # name of the author of the strategy
+    def author(self):
+        return "John Doe"
+
+    # number of auctions that will be simulated - called before the first auction
+    def set_num_auctions(self, num_auctions):
+        self.num_auctions = num_auctions
+
+    # amount of money available for all auctions - called before the first auction
+    def set_money(self, money):
+        self.remaining_money = money
+
+    # called after winning an auction with the price that was paid for the object
+    def won(self, price):
+        self.remaining_money -= price
+
+    # value of the object for this agent - called before every single-item auction
+    def set_value(self, value):
+        self.value = value
+
+    # shows interest in the object for the current price, called in each iteration of each auction
+    def interested(self, price, active_strats):
+        return price <= self.value and price <= self.remaining_money
+
+    # values of all items (item -> value) - called before every simultaneous auction
+    def set_values(self, values):
+        self.values = values
+
+    # items still wanted at the current prices (item -> price), called once per
+    # round of a simultaneous auction; active_counts gives the bidders left on
+    # each item. Instead of bidding on everything worth its price, the money
+    # goes to the least contested items first: they are sold sooner and
+    # cheaper, while contested ones would only drive up what is paid for all.
+    # Equally contested items go by the surplus they leave
+    def demand(self, prices, active_counts):
+        worth = [item for item, price in prices.items() if price <= self.values[item]]
+        worth.sort(key=lambda item: (active_counts[item], prices[item] - self.values[item], item))
+        wanted, cost = set(), 0
+        for item in worth:
+            if cost + prices[item] <= self.remaining_money:
+                wanted.add(item)
+                cost += prices[item]
+        return wanted
+
+def strategy_ascending(num_strategies):
+    return FocusedStrategy(num_strategies)
+
+def strategy_descending(num_strategies):
+    return FocusedStrategy(num_strategies)
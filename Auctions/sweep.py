@@ -0,0 +1,130 @@
+import argparse
+import csv
+import importlib
+import itertools
+import os
+import random
+import statistics
+
+import simulation
+
+# factory used for each auction type
+FACTORIES = {'english': 'strategy_ascending', 'dutch': 'strategy_descending',
+             'simultaneous': 'strategy_ascending'}
+
+STRATEGY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strategies')
+
+def strategy_modules():
+    names = sorted('.'.join(f.split('.')[:-1]) for f in os.listdir(STRATEGY_DIR))
+    return {name: importlib.import_module(f'strategies.{name}') for name in names if name}
+
+# "name=1.0,1.1,1.2" -> ('name', [1.0, 1.1, 1.2])
+def parse_values(text):
+    name, values = text.split('=', 1)
+    return name, [float(v) for v in values.split(',')]
+
+# "name=1.0:1.5" -> ('name', (1.0, 1.5))
+def parse_range(text):
+    name, bounds = text.split('=', 1)
+    low, high = (float(v) for v in bounds.split(':'))
+    return name, (low, high)
+
+def grid_configs(grid):
+    names = [name for name, _ in grid]
+    return [dict(zip(names, values)) for values in itertools.product(*(v for _, v in grid))]
+
+def random_configs(space, samples, rng):
+    return [{name: round(rng.uniform(low, high), 4) for name, (low, high) in space}
+            for _ in range(samples)]
+
+# one tournament of the candidate (built with `params`) against the rest of
+# the field; returns the candidate's profit. Repetition `rep` uses the same
+# random seed for every configuration, so they are compared on the same draws.
+def run_tournament(modules, candidate, params, auction_type, rep, seed, count, money, **auction_options):
+    factory = FACTORIES[auction_type]
+    num_strategies = len(modules)
+    player = getattr(modules[candidate], factory)(num_strategies, **params)
+    field = [getattr(m, factory)(num_strategies) for name, m in modules.items() if name != candidate]
+    random.seed(seed * 1000003 + rep)
+    profits = simulation.simulate_multiple([player] + field, auction_type, count=count, money=money,
+                                           **auction_options)
+    return profits[player.name()]
+
+# successive halving: every configuration gets min_reps repetitions, then
+# the best 1/eta go on with eta times as many, until one is left or max_reps
+# is reached. Repetitions already run are kept. Returns the per-configuration
+# scores and calls log(rung, config, scores) after every rung.
+def successive_halving(configs, evaluate, min_reps=2, max_reps=54, eta=3, log=None):
+    scores = [[] for _ in configs]
+    alive = list(range(len(configs)))
+    reps, rung = min_reps, 0
+    while True:
+        for i in alive:
+            scores[i] += [evaluate(configs[i], rep) for rep in range(len(scores[i]), reps)]
+            if log:
+                log(rung, configs[i], scores[i])
+        if len(alive) == 1 or reps >= max_reps:
+            return scores
+        alive.sort(key=lambda i: statistics.mean(scores[i]), reverse=True)
+        alive = alive[:max(1, len(alive) // eta)]
+        reps, rung = min(reps * eta, max_reps), rung + 1
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Tune strategy parameters with successive halving.')
+    parser.add_argument('strategy', help='module in strategies/ whose factory takes the parameters')
+    parser.add_argument('--auction', choices=sorted(FACTORIES), default='english')
+    parser.add_argument('--grid', type=parse_values, action='append', default=[], metavar='NAME=V1,V2,...',
+                        help='values to try for a parameter (all combinations are run)')
+    parser.add_argument('--space', type=parse_range, action='append', default=[], metavar='NAME=LOW:HIGH',
+                        help='range to sample a parameter from uniformly (random search)')
+    parser.add_argument('--samples', type=int, default=27, help='random search: configurations to sample')
+    parser.add_argument('--min-reps', type=int, default=2, help='tournaments per configuration in the first rung')
+    parser.add_argument('--max-reps', type=int, default=54, help='tournaments for the final configurations')
+    parser.add_argument('--eta', type=int, default=3, help='keep the best 1/ETA configurations at every rung')
+    parser.add_argument('--count', type=int, default=100, help='auctions per tournament')
+    parser.add_argument('--money', type=int, default=1000, help='starting money of every strategy')
+    parser.add_argument('--items', type=int, default=5, help='items per simultaneous auction')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results', default='sweep_results.csv', metavar='FILE',
+                        help='CSV file the results of every rung are written to')
+    args = parser.parse_args()
+
+    if bool(args.grid) == bool(args.space):
+        parser.error('give either --grid or --space parameters')
+
+    modules = strategy_modules()
+    if args.strategy not in modules:
+        parser.error(f'no strategy module {args.strategy!r} in {STRATEGY_DIR}')
+
+    if args.grid:
+        configs = grid_configs(args.grid)
+    else:
+        configs = random_configs(args.space, args.samples, random.Random(args.seed))
+    param_names = list(configs[0])
+
+    auction_options = {'items': args.items} if args.auction == 'simultaneous' else {}
+
+    def evaluate(config, rep):
+        return run_tournament(modules, args.strategy, config, args.auction, rep, args.seed,
+                              args.count, args.money, **auction_options)
+
+    with open(args.results, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rung'] + param_names + ['reps', 'mean_profit', 'stdev_profit'])
+
+        def log(rung, config, scores):
+            stdev = statistics.stdev(scores) if len(scores) > 1 else 0.0
+            writer.writerow([rung] + [config[n] for n in param_names] +
+                            [len(scores), round(statistics.mean(scores), 2), round(stdev, 2)])
+            f.flush()
+
+        scores = successive_halving(configs, evaluate, args.min_reps, args.max_reps, args.eta, log)
+
+    tournaments = sum(len(s) for s in scores)
+    ranked = sorted(range(len(configs)), key=lambda i: (len(scores[i]), statistics.mean(scores[i])), reverse=True)
+    print(f'{len(configs)} configurations, {tournaments} tournaments '
+          f'(a full sweep would run {len(configs) * args.max_reps}); results in {args.results}')
+    for i in ranked[:5]:
+        params = ', '.join(f'{n}={configs[i][n]}' for n in param_names)
+        print(f'\t\t{params:40} {statistics.mean(scores[i]):10.1f} over {len(scores[i])} tournaments')
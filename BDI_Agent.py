@@ -1,29 +1,129 @@
 #!/usr/bin/env python3
 
+from bisect import bisect_left
+from collections import defaultdict
+
+
+class Plan:
+    """A way to achieve a desire, applicable when its context condition holds.
+
+    `reads` lists the belief keys the context condition looks at; the agent
+    only re-checks the plan when one of them changes.
+    """
+    def __init__(self, desire, reads, context, action=None):
+        self.desire = desire
+        self.reads = tuple(reads)
+        self.context = context
+        self.action = action if action is not None else f"Action for {desire}"
+
+
+class PlanLibrary:
+    """Plans grouped by desire, with an index from belief key to dependent desires."""
+    def __init__(self, plans=()):
+        self.plans = defaultdict(list)
+        self.index = defaultdict(set)
+        for plan in plans:
+            self.add(plan)
+
+    def add(self, plan):
+        self.plans[plan.desire].append(plan)
+        for key in plan.reads:
+            self.index[key].add(plan.desire)
+
+    def plans_for(self, desire):
+        return self.plans.get(desire, ())
+
+    def dependents(self, key):
+        """Desires with at least one plan reading the belief `key`."""
+        return self.index.get(key, ())
+
+
+def default_plans():
+    return PlanLibrary([
+        Plan("go for a walk", ["weather"], lambda beliefs: beliefs.get("weather") == "sunny"),
+        Plan("read a book", [], lambda beliefs: True),
+    ])
+
+
 class BDI_Agent:
-    def __init__(self, beliefs, desires):
-        self.beliefs = beliefs      
-        self.desires = desires    
-        self.intentions = []
+    def __init__(self, beliefs, desires, plans=None, verbose=True):
+        self.beliefs = beliefs
+        self.desires = desires
+        self.plans = plans if plans is not None else default_plans()
+        self.verbose = verbose
+        self._rank = {desire: i for i, desire in enumerate(desires)}
+        self._intentions = {}                  # desire -> committed action
+        self._committed = []                   # desires with an intention, in desire order
+        self._actions = []                     # their actions, in the same order
+        self.dirty = dict.fromkeys(desires)    # desires to re-evaluate, in order
+
+    @property
+    def intentions(self):
+        """Committed actions in the order of the desires."""
+        return self._actions
+
+    @intentions.setter
+    def intentions(self, actions):
+        """Set the actions by hand; the next generate_intentions() deliberates every desire again."""
+        self._intentions.clear()
+        self._committed = None
+        self._actions = list(actions)
+        self.dirty = dict.fromkeys(self.desires)
+
+    def _position(self, desire):
+        return bisect_left(self._committed, self._rank[desire], key=self._rank.__getitem__)
+
+    def _commit(self, desire, action):
+        i = self._position(desire)
+        if desire in self._intentions:
+            self._actions[i] = action
+        else:
+            self._committed.insert(i, desire)
+            self._actions.insert(i, action)
+        self._intentions[desire] = action
+
+    def _drop(self, desire):
+        if desire in self._intentions:
+            i = self._position(desire)
+            del self._committed[i], self._actions[i]
+            del self._intentions[desire]
 
     def update_beliefs(self, new_belief):
-        """Update agent's beliefs based on new information."""
-        self.beliefs.update(new_belief)
+        """Update agent's beliefs and mark the desires depending on changed ones."""
+        for key, value in new_belief.items():
+            if key in self.beliefs and self.beliefs[key] == value:
+                continue
+            self.beliefs[key] = value
+            for desire in self.plans.dependents(key):
+                if desire in self._rank:
+                    self.dirty[desire] = None
 
     def add_desire(self, new_desire):
         """Add a new goal to the agent's desires."""
         self.desires.append(new_desire)
+        self._rank[new_desire] = len(self._rank)
+        self.dirty[new_desire] = None
+
+    def select_plan(self, desire):
+        """First plan for the desire whose context holds under the current beliefs."""
+        for plan in self.plans.plans_for(desire):
+            if plan.context(self.beliefs):
+                return plan
+        return None
 
     def generate_intentions(self):
-        """Select an intention based on the current beliefs and desires."""
-        self.intentions = [] 
-        for desire in self.desires:
-            if desire == "go for a walk" and self.beliefs.get("weather") == "sunny":
-                self.intentions.append(f"Action for {desire}")
-            elif desire == "read a book":
-                self.intentions.append(f"Action for {desire}")
+        """Re-evaluate only the desires affected by belief changes since the last call."""
+        if self._committed is None:   # intentions were set by hand
+            self._committed, self._actions = [], []
+        for desire in self.dirty:
+            plan = self.select_plan(desire)
+            if plan is not None:
+                self._commit(desire, plan.action)
             else:
-                print(f"Cannot commit to {desire} based on current beliefs.")
+                self._drop(desire)
+                if self.verbose:
+                    print(f"Cannot commit to {desire} based on current beliefs.")
+        self.dirty.clear()
 
     def execute_intentions(self):
         """Perform actions according to the intentions."""
@@ -31,13 +131,14 @@ class BDI_Agent:
             print(f"Executing: {intention}")
 
 
-beliefs = {"location": "home", "weather": "sunny"}
-desires = ["go for a walk", "read a book"]
+if __name__ == "__main__":
+    beliefs = {"location": "home", "weather": "sunny"}
+    desires = ["go for a walk", "read a book"]
 
-agent = BDI_Agent(beliefs, desires)
+    agent = BDI_Agent(beliefs, desires)
 
-agent.update_beliefs({"weather": "rainy"})
+    agent.update_beliefs({"weather": "rainy"})
 
-agent.generate_intentions()
+    agent.generate_intentions()
 
-agent.execute_intentions()
+    agent.execute_intentions()
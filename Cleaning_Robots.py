@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 
+import argparse
 import random
 
+import profiling
+from profiling import timed
+from scenario import Scenario, load_scenario
+
 GRID_SIZE = 7
 R2_POSITION = (GRID_SIZE // 2, GRID_SIZE // 2)
 
@@ -15,6 +20,7 @@ class Robot:
     def pos(self):
         return (self.x, self.y)
 
+    @timed("move.towards")
     def move_towards(self, target_x, target_y):
         """Move the robot one step closer to the target (x, y)."""
         if self.x < target_x:
@@ -52,23 +58,33 @@ class BurningRobot(Robot):
         if self.pos() == R2_POSITION:
             print(f"{self.name} burned garbage at its position ({self.x}, {self.y})")
 
-environment = [['.' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+def setup_environment(grid_size=GRID_SIZE, garbage=5):
+    """Create a grid with garbage on `garbage` distinct cells."""
+    grid = [['.' for _ in range(grid_size)] for _ in range(grid_size)]
+    placed = 0
+    while placed < min(garbage, grid_size * grid_size):
+        gx, gy = random.randint(0, grid_size-1), random.randint(0, grid_size-1)
+        if grid[gx][gy] != 'G':
+            grid[gx][gy] = 'G'
+            placed += 1
+    return grid
 
-for _ in range(5):
-    gx, gy = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
-    environment[gx][gy] = 'G'
+environment = setup_environment()
 
 r1 = CleaningRobot('r1', 0, 0)  # At North West corner
 r2 = BurningRobot('r2', R2_POSITION[0], R2_POSITION[1])  # At the center
 
+@timed("print.environment")
 def print_environment():
     """Display the environment grid."""
     for row in environment:
         print(' '.join(row))
     print()
 
+@timed("sim.simulate")
 def simulate():
-    garbage_positions = [(x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE) if environment[x][y] == 'G']
+    garbage_positions = [(x, y) for x in range(len(environment)) for y in range(len(environment[0]))
+                         if environment[x][y] == 'G']
     
     for gx, gy in garbage_positions:
         while r1.pos() != (gx, gy):
@@ -85,10 +101,28 @@ def simulate():
 
         r2.burn()
 
-print("Initial Environment:")
-print_environment()
-
-simulate()
-
-print("\nFinal Environment:")
-print_environment()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean garbage with a cleaning and a burning robot.")
+    parser.add_argument('--scenario', metavar='FILE', help='load the map from a scenario or pack file')
+    parser.add_argument('--index', type=int, help='scenario to load from a pack file')
+    parser.add_argument('--save-scenario', metavar='FILE', help='save the map before the run')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+    profiling.enable_from_args(args)
+
+    if args.scenario:
+        scenario = load_scenario(args.scenario, args.index)
+        environment = scenario.grid
+        R2_POSITION = scenario.depot
+        r1.x, r1.y = scenario.robots[0]
+        r2.x, r2.y = R2_POSITION
+    if args.save_scenario:
+        Scenario(environment, R2_POSITION, [r1.pos()]).save(args.save_scenario)
+
+    print("Initial Environment:")
+    print_environment()
+
+    simulate()
+
+    print("\nFinal Environment:")
+    print_environment()
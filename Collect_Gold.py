@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 
+import argparse
+import atexit
 import pygame
 import random
 import heapq
 import sys
+from collections import OrderedDict
+
+import profiling
+from analytics import LAYERS, TrafficStats
+from gold_index import GoldIndex
+from gold_routing import plan_trips
+from profiling import phase, timed
+from recording import FrameRecorder
 
 # Initialize Pygame
 pygame.init()
@@ -25,14 +35,20 @@ GREEN = (100, 255, 100)
 DARK_GRAY = (50, 50, 50)
 
 DEPOT_POSITION = (4,4)  # Center at (4, 4) for 9x9 grid
+PATH_CACHE_SIZE = 1024
 
 class Robot:
-    def __init__(self, name, x, y, color):
+    def __init__(self, name, x, y, color, capacity=1):
         self.name = name
         self.x = x
         self.y = y
         self.color = color
-        self.gold_collected = False
+        self.capacity = capacity  # pieces of gold carried at once
+        self.carrying = 0
+
+    @property
+    def gold_collected(self):
+        return self.carrying > 0
 
     def pos(self):
         return (self.x, self.y)
@@ -41,42 +57,86 @@ class Robot:
         self.x = x
         self.y = y
 
-    def pick(self, environment):
-        if environment[self.x][self.y] == 'G':
-            self.gold_collected = True
+    def pick(self, environment, gold_index=None):
+        if environment[self.x][self.y] == 'G' and self.carrying < self.capacity:
+            self.carrying += 1
             environment[self.x][self.y] = '.'
+            if gold_index is not None:
+                gold_index.remove(self.pos())
             return True
         return False
 
     def drop(self):
-        if self.gold_collected:
-            self.gold_collected = False
-            return True
-        return False
+        """Drop everything carried; returns the number of pieces dropped."""
+        dropped = self.carrying
+        self.carrying = 0
+        return dropped
+
+class PathCache:
+    """Bounded LRU cache of A* results keyed by (start, goal, grid_version)."""
+    MISSING = object()
+
+    def __init__(self, max_size=PATH_CACHE_SIZE):
+        self.max_size = max_size
+        self.paths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Cached path (or None for "no path"), or PathCache.MISSING."""
+        path = self.paths.get(key, self.MISSING)
+        if path is self.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.paths.move_to_end(key)
+        return path
+
+    def put(self, key, path):
+        self.paths[key] = path
+        self.paths.move_to_end(key)
+        if len(self.paths) > self.max_size:
+            self.paths.popitem(last=False)
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + 100))
-        pygame.display.set_caption("Navigate a grid environment to collect gold")
+    def __init__(self, capacity=1, recorder=None, analytics=None):
+        # When recording, frames are drawn on an offscreen surface instead of a window
+        self.recorder = recorder
+        # Optional TrafficStats; H cycles through its layers as a heatmap overlay
+        self.analytics = analytics
+        self.overlay = None
+        if recorder:
+            self.screen = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE + 100))
+        else:
+            self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + 100))
+            pygame.display.set_caption("Navigate a grid environment to collect gold")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
         
+        # Paths are cached until the obstacles change (grid_version is bumped)
+        self.grid_version = 0
+        self.path_cache = PathCache()
+
         # Initialize environment
         self.environment = [['.' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.setup_environment()
         
         # Initialize robots
-        self.r1 = Robot('R1', DEPOT_POSITION[0], DEPOT_POSITION[1], BLUE)
+        self.capacity = capacity
+        self.r1 = Robot('R1', DEPOT_POSITION[0], DEPOT_POSITION[1], BLUE, capacity)
         self.r2 = Robot('R2', DEPOT_POSITION[0], DEPOT_POSITION[1], RED)
         
         self.gold_collected = 0
+        self.steps = 0
         self.total_gold = 5
         self.message = "Press SPACE to start simulation"
         self.running = False
         self.current_path = []
 
     def setup_environment(self):
+        self.grid_version += 1
+        self.gold_index = GoldIndex(GRID_SIZE)
         placed_positions = set()
         
         # Place 5 pieces of gold
@@ -85,6 +145,7 @@ class Game:
             gx, gy = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
             if (gx, gy) not in placed_positions and (gx, gy) != DEPOT_POSITION:
                 self.environment[gx][gy] = 'G'
+                self.gold_index.add((gx, gy))
                 placed_positions.add((gx, gy))
                 gold_count += 1
         
@@ -97,6 +158,24 @@ class Game:
                 placed_positions.add((ox, oy))
                 obstacle_count += 1
 
+    def set_cell(self, x, y, value):
+        """Change a cell, invalidating cached paths if an obstacle appears or goes."""
+        if (self.environment[x][y] == '#') != (value == '#'):
+            self.grid_version += 1
+        if value == 'G':
+            self.gold_index.add((x, y))
+        else:
+            self.gold_index.remove((x, y))
+        self.environment[x][y] = value
+
+    def toggle_obstacle(self, x, y):
+        """Put an obstacle on an empty cell or clear it again; gold, the depot and the robots are left alone."""
+        if not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE) or (x, y) in (DEPOT_POSITION, self.r1.pos(), self.r2.pos()):
+            return
+        if self.environment[x][y] in '.#':
+            self.set_cell(x, y, '.' if self.environment[x][y] == '#' else '#')
+            self.message = f"Obstacle {'added' if self.environment[x][y] == '#' else 'removed'} at ({x}, {y})"
+
     def manhattan_distance(self, x1, y1, x2, y2):
         return abs(x1 - x2) + abs(y1 - y2)
 
@@ -110,6 +189,19 @@ class Game:
         return neighbors
 
     def astar(self, start_x, start_y, goal_x, goal_y):
+        """Shortest path from start to goal, served from the path cache when possible.
+
+        The returned list is shared with the cache and must not be modified.
+        """
+        key = ((start_x, start_y), (goal_x, goal_y), self.grid_version)
+        path = self.path_cache.get(key)
+        if path is PathCache.MISSING:
+            path = self.search(start_x, start_y, goal_x, goal_y)
+            self.path_cache.put(key, path)
+        return path
+
+    @timed("plan.astar")
+    def search(self, start_x, start_y, goal_x, goal_y):
         start = (start_x, start_y)
         goal = (goal_x, goal_y)
         
@@ -126,6 +218,8 @@ class Game:
             visited.add(current)
             
             if current == goal:
+                if self.analytics:
+                    self.analytics.expanded(visited)
                 return path
             
             cx, cy = current
@@ -144,8 +238,11 @@ class Game:
                     new_path = path + [neighbor]
                     heapq.heappush(heap, (f_score, counter, neighbor, new_path))
         
+        if self.analytics:
+            self.analytics.expanded(visited)
         return None
 
+    @timed("render.draw_grid")
     def draw_grid(self):
         # Draw cells
         for x in range(GRID_SIZE):
@@ -171,6 +268,9 @@ class Game:
                     pygame.draw.circle(self.screen, GOLD, center, CELL_SIZE // 3)
                     pygame.draw.circle(self.screen, BLACK, center, CELL_SIZE // 3, 2)
         
+        if self.overlay:
+            self.draw_overlay(self.analytics[self.overlay])
+        
         # Draw current path
         if self.current_path:
             for i in range(len(self.current_path) - 1):
@@ -185,6 +285,19 @@ class Game:
         if self.r1.pos() != self.r2.pos():
             self.draw_robot(self.r2)
 
+    def draw_overlay(self, layer):
+        """Shade every cell in proportion to its value in an analytics layer."""
+        peak = layer.max()
+        if peak <= 0:
+            return
+        overlay = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE), pygame.SRCALPHA)
+        for x in range(GRID_SIZE):
+            for y in range(GRID_SIZE):
+                if layer[x, y]:
+                    alpha = int(40 + 160 * layer[x, y] / peak)
+                    overlay.fill((255, 0, 0, alpha), pygame.Rect(y * CELL_SIZE, x * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        self.screen.blit(overlay, (0, 0))
+
     def draw_robot(self, robot):
         center = (robot.y * CELL_SIZE + CELL_SIZE // 2, robot.x * CELL_SIZE + CELL_SIZE // 2)
         pygame.draw.circle(self.screen, robot.color, center, CELL_SIZE // 4)
@@ -196,6 +309,7 @@ class Game:
                              (center[0], center[1] - CELL_SIZE // 6), 
                              CELL_SIZE // 8)
 
+    @timed("render.draw_info")
     def draw_info(self):
         info_y = WINDOW_SIZE + 10
         
@@ -207,47 +321,72 @@ class Game:
         gold_text = self.font.render(f"Gold: {self.gold_collected}/{self.total_gold}", True, GOLD)
         self.screen.blit(gold_text, (10, info_y + 30))
         
+        # Draw path cache counters
+        cache_text = self.small_font.render(
+            f"Path cache: {self.path_cache.hits} hits / {self.path_cache.misses} misses", True, GRAY)
+        self.screen.blit(cache_text, (10, info_y + 65))
+
+        if self.overlay:
+            overlay_text = self.small_font.render(
+                f"Heatmap: {self.overlay} ({self.analytics.episodes} episodes)", True, RED)
+            self.screen.blit(overlay_text, (WINDOW_SIZE - 440, info_y + 65))
+
         # Draw instructions
         if not self.running:
-            inst_text = self.small_font.render("SPACE: Start | R: Reset | ESC: Quit", True, BLACK)
-            self.screen.blit(inst_text, (WINDOW_SIZE - 350, info_y + 35))
+            inst_text = self.small_font.render(
+                "SPACE: Start | R: Reset | H: Heatmap | Click: Obstacle | ESC: Quit", True, BLACK)
+            self.screen.blit(inst_text, (WINDOW_SIZE - inst_text.get_width() - 10, info_y + 35))
 
+    @timed("sim.step")
     def simulate_step(self):
-        gold_positions = [(x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE) 
-                          if self.environment[x][y] == 'G']
-        
-        if not gold_positions:
+        if not self.gold_index:
             self.message = "All gold collected!"
             self.running = False
             return False
         
-        # Get next gold
-        gx, gy = gold_positions[0]
-        
-        # Path to gold
-        path_to_gold = self.astar(self.r1.x, self.r1.y, gx, gy)
-        if path_to_gold is None:
-            self.message = f"No path to gold at ({gx}, {gy})"
-            return False
+        # Get the nearest gold, or the next trip if the robot carries several pieces
+        if self.r1.capacity > 1:
+            with phase("plan.trips"):
+                trips = plan_trips(self.environment, DEPOT_POSITION, sorted(self.gold_index), self.r1.capacity)
+            if not trips:
+                self.message = "No path to any gold"
+                self.record_wait()
+                return False
+            trip = trips[0]
+        else:
+            trip = [self.gold_index.nearest(self.r1.x, self.r1.y)]
         
-        # Animate movement to gold
-        self.current_path = path_to_gold
-        for px, py in path_to_gold[1:]:
-            self.r1.move_to(px, py)
-            self.message = f"Moving to gold at ({gx}, {gy})"
+        for gx, gy in trip:
+            # Path to gold
+            path_to_gold = self.astar(self.r1.x, self.r1.y, gx, gy)
+            if path_to_gold is None:
+                self.message = f"No path to gold at ({gx}, {gy})"
+                self.record_wait()
+                return False
+            
+            # Animate movement to gold
+            self.current_path = path_to_gold
+            for px, py in path_to_gold[1:]:
+                self.r1.move_to(px, py)
+                self.message = f"Moving to gold at ({gx}, {gy})"
+                self.draw()
+                self.wait(200)
+            self.steps += len(path_to_gold) - 1
+            if self.analytics:
+                self.analytics.visit_path(path_to_gold[1:])
+            
+            # Pick gold
+            self.r1.pick(self.environment, self.gold_index)
+            self.record_wait()
+            self.message = f"Picked up gold at ({gx}, {gy})"
             self.draw()
-            pygame.time.wait(200)
-        
-        # Pick gold
-        self.r1.pick(self.environment)
-        self.message = f"Picked up gold at ({gx}, {gy})"
-        self.draw()
-        pygame.time.wait(500)
+            self.wait(500)
         
         # Path to depot
         path_to_depot = self.astar(self.r1.x, self.r1.y, DEPOT_POSITION[0], DEPOT_POSITION[1])
         if path_to_depot is None:
             self.message = "No path back to depot!"
+            self.record_wait()
             return False
         
         # Animate movement to depot
@@ -256,30 +395,64 @@ class Game:
             self.r1.move_to(px, py)
             self.message = "Returning to depot"
             self.draw()
-            pygame.time.wait(200)
+            self.wait(200)
+        self.steps += len(path_to_depot) - 1
+        if self.analytics:
+            self.analytics.visit_path(path_to_depot[1:])
         
         # Drop and process
-        self.r1.drop()
-        self.gold_collected += 1
-        self.message = f"Gold processed! ({self.gold_collected}/{self.total_gold})"
+        self.gold_collected += self.r1.drop()
+        self.record_wait()
+        if self.analytics and not self.gold_index:
+            self.analytics.end_episode()  # the run is over once the last gold is delivered
+        self.message = (f"Gold processed! ({self.gold_collected}/{self.total_gold}, "
+                        f"{self.steps / max(self.gold_collected, 1):.1f} steps per gold)")
         self.current_path = []
         self.draw()
-        pygame.time.wait(500)
+        self.wait(500)
         
         return True
 
+    def record_wait(self):
+        """Count a tick R1 spends without moving (picking, dropping or blocked)."""
+        if self.analytics:
+            self.analytics.wait(self.r1.x, self.r1.y)
+
+    def wait(self, ms):
+        if self.recorder:
+            self.recorder.hold(ms)
+        else:
+            pygame.time.wait(ms)
+
     def draw(self):
         self.screen.fill(WHITE)
         self.draw_grid()
         self.draw_info()
-        pygame.display.flip()
+        if self.recorder:
+            with phase("render.capture"):
+                self.recorder.add_frame(self.screen)
+        else:
+            with phase("render.flip"):
+                pygame.display.flip()
+
+    def record(self):
+        """Run the whole simulation offscreen without waiting, then finish the recording."""
+        self.running = True
+        self.message = "Simulation running..."
+        self.draw()
+        while self.running and self.simulate_step():
+            pass
+        self.running = False
+        self.draw()
+        self.recorder.close()
 
     def reset(self):
         self.environment = [['.' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.setup_environment()
-        self.r1 = Robot('R1', DEPOT_POSITION[0], DEPOT_POSITION[1], BLUE)
+        self.r1 = Robot('R1', DEPOT_POSITION[0], DEPOT_POSITION[1], BLUE, self.capacity)
         self.r2 = Robot('R2', DEPOT_POSITION[0], DEPOT_POSITION[1], RED)
         self.gold_collected = 0
+        self.steps = 0
         self.message = "Environment reset. Press SPACE to start"
         self.running = False
         self.current_path = []
@@ -302,6 +475,14 @@ class Game:
                     
                     if event.key == pygame.K_r:
                         self.reset()
+                    
+                    if event.key == pygame.K_h and self.analytics:
+                        # off -> visits -> expansions -> waits -> off
+                        cycle = (None,) + LAYERS
+                        self.overlay = cycle[(cycle.index(self.overlay) + 1) % len(cycle)]
+
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self.running:
+                    self.toggle_obstacle(event.pos[1] // CELL_SIZE, event.pos[0] // CELL_SIZE)
             
             if self.running:
                 if not self.simulate_step():
@@ -311,5 +492,28 @@ class Game:
             self.clock.tick(FPS)
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Collect gold on a grid with A* pathfinding.")
+    parser.add_argument('--capacity', type=int, default=1, help='pieces of gold the robot can carry')
+    parser.add_argument('--record', metavar='FILE',
+                        help='run offscreen and save an animated GIF (FILE.gif) or a PNG sequence (directory)')
+    parser.add_argument('--analytics', metavar='FILE.npz',
+                        help='accumulate cell visits, A* expansions and waits in FILE.npz (H shows them)')
+    parser.add_argument('--overlay', choices=LAYERS, help='analytics layer to show from the start')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+    profiling.enable_from_args(args)
+
+    analytics = None
+    if args.analytics:
+        analytics = TrafficStats.load(args.analytics, (GRID_SIZE, GRID_SIZE))
+        atexit.register(analytics.save, args.analytics)
+
+    recorder = FrameRecorder(args.record, frame_ms=1000 // FPS) if args.record else None
+    game = Game(args.capacity, recorder, analytics)
+    if analytics:
+        game.overlay = args.overlay
+    if args.record:
+        game.record()
+        print(f"Recorded {recorder.frames} frames to {args.record}")
+    else:
+        game.run()
\ No newline at end of file
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 
+import argparse
 import random
 import heapq
 
+import profiling
+from gold_routing import plan_trips
+from analytics import TrafficStats
+from profiling import phase, timed
+from scenario import Scenario, load_scenario
+
 GRID_SIZE = 9
 DEPOT_POSITION = (4,4)  # Center at (4, 4) for 9x9 grid
 
@@ -11,11 +18,17 @@ DEPOT_POSITION = (4,4)  # Center at (4, 4) for 9x9 grid
 This Robot class creates a blueplrint for robot objects that can move around the grid and interact with gold.
 '''
 class Robot:
-    def __init__(self, name, x, y):
+    def __init__(self, name, x, y, capacity=1):
         self.name = name
         self.x = x
         self.y = y
-        self.gold_collected = False # Tracks whether the robot is carrying gold
+        self.capacity = capacity # Pieces of gold the robot can carry at once
+        self.carrying = 0
+
+    @property
+    def gold_collected(self):
+        """Whether the robot is carrying gold."""
+        return self.carrying > 0
 
     def pos(self):
         return (self.x, self.y)
@@ -27,20 +40,20 @@ class Robot:
 
     def pick(self):
         """Pick up gold if on the same position."""
-        if environment[self.x][self.y] == 'G':
-            self.gold_collected = True
+        if environment[self.x][self.y] == 'G' and self.carrying < self.capacity:
+            self.carrying += 1
             environment[self.x][self.y] = '.'
             print(f"{self.name} picked up gold at ({self.x}, {self.y})")
 
     def drop(self):
-        """Drop gold at current position if holding any."""
+        """Drop all gold at current position if holding any."""
         if self.gold_collected:
-            print(f"{self.name} dropped gold at ({self.x}, {self.y})")
-            self.gold_collected = False
+            print(f"{self.name} dropped {self.carrying} gold at ({self.x}, {self.y})")
+            self.carrying = 0
 
 class CollectingRobot(Robot):
-    def __init__(self, name, x, y):
-        super().__init__(name, x, y)
+    def __init__(self, name, x, y, capacity=1):
+        super().__init__(name, x, y, capacity)
 
 class DepotRobot(Robot):
     def __init__(self, name, x, y):
@@ -51,29 +64,39 @@ class DepotRobot(Robot):
         if self.pos() == DEPOT_POSITION:
             print(f"{self.name} processed gold at depot ({self.x}, {self.y})")
 
+def setup_environment(grid_size=GRID_SIZE, gold=5, obstacles=10, depot=None):
+    """Create a grid with gold and obstacles placed without overlap (and off the depot)."""
+    depot = depot or DEPOT_POSITION
+    grid = [['.' for _ in range(grid_size)] for _ in range(grid_size)]
+
+    # Place gold and obstacles ensuring no overlap
+    placed_positions = set()
+
+    # Place the gold
+    gold_count = 0
+    while gold_count < gold:
+        gx, gy = random.randint(0, grid_size-1), random.randint(0, grid_size-1)
+        if (gx, gy) not in placed_positions and (gx, gy) != depot:
+            grid[gx][gy] = 'G'
+            placed_positions.add((gx, gy))
+            gold_count += 1
+
+    # Place the obstacles
+    obstacle_count = 0
+    while obstacle_count < obstacles:
+        ox, oy = random.randint(0, grid_size-1), random.randint(0, grid_size-1)
+        if (ox, oy) not in placed_positions and (ox, oy) != depot:
+            grid[ox][oy] = '#'
+            placed_positions.add((ox, oy))
+            obstacle_count += 1
+
+    return grid
+
 # Initialize environment
-environment = [['.' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-
-# Place gold and obstacles ensuring no overlap
-placed_positions = set()
-
-# Place 5 pieces of gold
-gold_count = 0
-while gold_count < 5:
-    gx, gy = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
-    if (gx, gy) not in placed_positions and (gx, gy) != DEPOT_POSITION:
-        environment[gx][gy] = 'G'
-        placed_positions.add((gx, gy))
-        gold_count += 1
-
-# Place 10 obstacles
-obstacle_count = 0
-while obstacle_count < 10:
-    ox, oy = random.randint(0, GRID_SIZE-1), random.randint(0, GRID_SIZE-1)
-    if (ox, oy) not in placed_positions and (ox, oy) != DEPOT_POSITION:
-        environment[ox][oy] = '#'
-        placed_positions.add((ox, oy))
-        obstacle_count += 1
+environment = setup_environment()
+
+# Optional TrafficStats filled by astar() and simulate()
+analytics = None
 
 # Initialize robots at center
 r1 = CollectingRobot('r1', DEPOT_POSITION[0], DEPOT_POSITION[1])
@@ -83,18 +106,21 @@ def manhattan_distance(x1, y1, x2, y2):
     """Heuristic function for A*."""
     return abs(x1 - x2) + abs(y1 - y2)
 
-def get_neighbors(x, y):
+def get_neighbors(x, y, grid=None):
     """Get valid neighboring cells (4-directional movement)."""
+    if grid is None:
+        grid = environment
     neighbors = []
     for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
         nx, ny = x + dx, y + dy
-        if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
-            if environment[nx][ny] != '#':  # Not an obstacle
+        if 0 <= nx < len(grid) and 0 <= ny < len(grid[0]):
+            if grid[nx][ny] != '#':  # Not an obstacle
                 neighbors.append((nx, ny))
     return neighbors
 
-def astar(start_x, start_y, goal_x, goal_y):
-    """A* pathfinding algorithm."""
+@timed("plan.astar")
+def astar(start_x, start_y, goal_x, goal_y, grid=None):
+    """A* pathfinding algorithm on `grid` (the global environment by default)."""
     start = (start_x, start_y)
     goal = (goal_x, goal_y)
     
@@ -115,11 +141,13 @@ def astar(start_x, start_y, goal_x, goal_y):
         visited.add(current)
         
         if current == goal:
+            if analytics is not None:
+                analytics.expanded(visited)
             return path
         
         cx, cy = current
         
-        for neighbor in get_neighbors(cx, cy):
+        for neighbor in get_neighbors(cx, cy, grid):
             if neighbor in visited:
                 continue
             
@@ -133,11 +161,14 @@ def astar(start_x, start_y, goal_x, goal_y):
                 new_path = path + [neighbor]
                 heapq.heappush(heap, (f_score, counter, neighbor, new_path))
     
+    if analytics is not None:
+        analytics.expanded(visited)
     return None  # No path found
 
+@timed("print.environment")
 def print_environment():
     """Display the environment grid with robot positions."""
-    grid_copy = [row[:] for row in environment] # list comprehension
+    grid_copy = [list(row) for row in environment] # list comprehension
     
     # Mark robot positions
     if r1.pos() == r2.pos():
@@ -149,7 +180,8 @@ def print_environment():
             grid_copy[r2.x][r2.y] = '2'
     
         # Print top border
-    print('┌' + '───┬' * (GRID_SIZE - 1) + '───┐')
+    rows, cols = len(grid_copy), len(grid_copy[0])
+    print('┌' + '───┬' * (cols - 1) + '───┐')
     
     # Print each row with borders
     for i, row in enumerate(grid_copy):
@@ -159,62 +191,130 @@ def print_environment():
         print()
         
         # Print separator between rows (but not after last row)
-        if i < GRID_SIZE - 1:
-            print('├' + '───┼' * (GRID_SIZE - 1) + '───┤')
+        if i < rows - 1:
+            print('├' + '───┼' * (cols - 1) + '───┤')
     
     # Print bottom border
-    print('└' + '───┴' * (GRID_SIZE - 1) + '───┘')
+    print('└' + '───┴' * (cols - 1) + '───┘')
     print()
 
      # for row in grid_copy:
          # print(' '.join(row))
      # print()
 
+@timed("sim.simulate")
 def simulate():
-    """Simulate robot gold collection using A* pathfinding."""
-    gold_positions = [(x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE) 
+    """Simulate robot gold collection using A* pathfinding.
+
+    If r1 can carry more than one piece it follows the trips of the
+    capacitated route planner. Returns (steps, pieces of gold delivered).
+    """
+    capacity = r1.capacity
+    gold_positions = [(x, y) for x in range(len(environment)) for y in range(len(environment[0]))
                       if environment[x][y] == 'G']
     
     print(f"Found {len(gold_positions)} pieces of gold to collect\n")
-    
-    for idx, (gx, gy) in enumerate(gold_positions, 1):
-        print(f"=== Collecting gold piece {idx}/{len(gold_positions)} at ({gx}, {gy}) ===")
-        
-        # Find path from current position to gold
-        path_to_gold = astar(r1.x, r1.y, gx, gy)
-        
-        if path_to_gold is None:
-            print(f"No path found to gold at ({gx}, {gy})!")
+
+    if capacity > 1:
+        with phase("plan.trips"):
+            trips = plan_trips(environment, DEPOT_POSITION, gold_positions, capacity)
+    else:
+        trips = [[gold] for gold in gold_positions]
+
+    steps = delivered = idx = 0
+    for trip in trips:
+        for gx, gy in trip:
+            idx += 1
+            print(f"=== Collecting gold piece {idx}/{len(gold_positions)} at ({gx}, {gy}) ===")
+            
+            # Find path from current position to gold
+            path_to_gold = astar(r1.x, r1.y, gx, gy)
+            
+            if path_to_gold is None:
+                print(f"No path found to gold at ({gx}, {gy})!")
+                if analytics is not None:
+                    analytics.wait(r1.x, r1.y)  # blocked for a tick
+                continue
+            
+            # Move along the path to gold
+            with phase("move.path"):
+                for step, (px, py) in enumerate(path_to_gold[1:], 1):
+                    r1.move_to(px, py)
+                    print(f"{r1.name} moved to ({r1.x}, {r1.y}) [step {step}/{len(path_to_gold)-1}]")
+            steps += len(path_to_gold) - 1
+            if analytics is not None:
+                analytics.visit_path(path_to_gold[1:])
+            
+            r1.pick()
+            if analytics is not None:
+                analytics.wait(r1.x, r1.y)
+
+        if not r1.gold_collected:
             continue
         
-        # Move along the path to gold
-        for step, (px, py) in enumerate(path_to_gold[1:], 1):
-            r1.move_to(px, py)
-            print(f"{r1.name} moved to ({r1.x}, {r1.y}) [step {step}/{len(path_to_gold)-1}]")
-        
-        r1.pick()
-        
         # Find path back to depot
         path_to_depot = astar(r1.x, r1.y, DEPOT_POSITION[0], DEPOT_POSITION[1])
         
         if path_to_depot is None:
             print(f"No path found back to depot!")
+            if analytics is not None:
+                analytics.wait(r1.x, r1.y)
             continue
         
         # Move along the path to depot
-        for step, (px, py) in enumerate(path_to_depot[1:], 1):
-            r1.move_to(px, py)
-            print(f"{r1.name} moved to ({r1.x}, {r1.y}) [step {step}/{len(path_to_depot)-1}]")
+        with phase("move.path"):
+            for step, (px, py) in enumerate(path_to_depot[1:], 1):
+                r1.move_to(px, py)
+                print(f"{r1.name} moved to ({r1.x}, {r1.y}) [step {step}/{len(path_to_depot)-1}]")
+        steps += len(path_to_depot) - 1
+        if analytics is not None:
+            analytics.visit_path(path_to_depot[1:])
         
+        delivered += r1.carrying
         r1.drop()
+        if analytics is not None:
+            analytics.wait(r1.x, r1.y)
         r2.process()
         print()
 
-print("Initial Environment:")
-print("Legend: . = empty, G = gold, # = obstacle, R = robots (at depot)")
-print_environment()
+    if analytics is not None:
+        analytics.end_episode()
+    if delivered:
+        print(f"Delivered {delivered} gold in {steps} steps ({steps / delivered:.1f} steps per gold, capacity {capacity})\n")
+    return steps, delivered
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect gold on a grid with A* pathfinding.")
+    parser.add_argument('--capacity', type=int, default=1, help='pieces of gold the robot can carry')
+    parser.add_argument('--scenario', metavar='FILE', help='load the map from a scenario or pack file')
+    parser.add_argument('--index', type=int, help='scenario to load from a pack file')
+    parser.add_argument('--save-scenario', metavar='FILE', help='save the map before the run')
+    parser.add_argument('--analytics', metavar='FILE.npz',
+                        help='add cell visits, A* expansions and waits of this run to FILE.npz')
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+    profiling.enable_from_args(args)
+
+    if args.scenario:
+        scenario = load_scenario(args.scenario, args.index)
+        environment = scenario.grid
+        DEPOT_POSITION = scenario.depot
+        r1.move_to(*scenario.robots[0])
+        r2.move_to(*DEPOT_POSITION)
+    if args.save_scenario:
+        Scenario(environment, DEPOT_POSITION, [r1.pos()]).save(args.save_scenario)
+
+    r1.capacity = args.capacity
+    if args.analytics:
+        analytics = TrafficStats.load(args.analytics, (len(environment), len(environment[0])))
+
+    print("Initial Environment:")
+    print("Legend: . = empty, G = gold, # = obstacle, R = robots (at depot)")
+    print_environment()
 
-simulate()
+    simulate()
+    if analytics is not None:
+        analytics.save(args.analytics)
 
-print("Final Environment:")
-print_environment()
\ No newline at end of file
+    print("Final Environment:")
+    print_environment()
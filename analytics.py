@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""Per-cell traffic analytics for the gold runs.
+
+TrafficStats accumulates, over any number of episodes, how often robots
+entered each cell (visits), how often A* expanded it (expansions) and how
+many ticks a robot spent on it without moving (waits): picking up gold,
+dropping it at the depot, or blocked because no path was found. A tick
+is one step of a path. Cells are recorded as flat indices in plain
+Python lists and only added into the NumPy arrays when a buffer fills up
+or a result is read, so recording costs a list append per cell (one
+extend per path or per search).
+
+The arrays are saved with save() as an .npz file; loading the same file
+again with load() continues the totals across runs, as long as the grid
+has the same shape.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+LAYERS = ('visits', 'expansions', 'waits')
+
+
+def _npz(path):
+    return path if path.endswith('.npz') else path + '.npz'
+
+
+class TrafficStats:
+    def __init__(self, shape, buffer_size=65536):
+        self.shape = shape
+        self.buffer_size = buffer_size
+        self.episodes = 0
+        self._arrays = {name: np.zeros(shape, dtype=np.int64) for name in LAYERS}
+        self._pending = {name: [] for name in LAYERS}
+
+    @classmethod
+    def load(cls, path, shape=None):
+        """Stats saved at `path`, or empty ones of `shape` if there is no such file.
+
+        Raises ValueError if the saved stats are for a grid of another shape.
+        """
+        if not os.path.exists(_npz(path)):
+            return cls(shape)
+        with np.load(_npz(path)) as saved:
+            saved_shape = saved['visits'].shape
+            if shape is not None and saved_shape != tuple(shape):
+                raise ValueError(f"{_npz(path)} holds stats for a {saved_shape[0]}x{saved_shape[1]} grid, "
+                                 f"not {shape[0]}x{shape[1]}")
+            stats = cls(saved_shape)
+            for name in LAYERS:
+                if name in saved.files:   # files saved before the layer existed lack it
+                    stats._arrays[name] += saved[name]
+            stats.episodes = int(saved['episodes'])
+        return stats
+
+    def _record(self, name, cells):
+        pending = self._pending[name]
+        width = self.shape[1]
+        pending.extend(x * width + y for x, y in cells)
+        if len(pending) >= self.buffer_size:
+            self.flush()
+
+    def visit(self, x, y):
+        self._record('visits', ((x, y),))
+
+    def visit_path(self, path):
+        """Count a visit for every cell of `path` (the cells entered, not the start)."""
+        self._record('visits', path)
+
+    def expanded(self, cells):
+        """Count one A* expansion for each cell (the closed set of a search)."""
+        self._record('expansions', cells)
+
+    def wait(self, x, y, ticks=1):
+        """Count `ticks` ticks a robot stayed on (x, y) without moving."""
+        self._record('waits', ((x, y),) * ticks)
+
+    def end_episode(self):
+        self.episodes += 1
+
+    def flush(self):
+        cells = self.shape[0] * self.shape[1]
+        for name, pending in self._pending.items():
+            if not pending:
+                continue
+            self._arrays[name] += np.bincount(pending, minlength=cells).reshape(self.shape)
+            pending.clear()
+
+    def __getitem__(self, name):
+        """The accumulated array of one layer."""
+        self.flush()
+        return self._arrays[name]
+
+    def save(self, path):
+        self.flush()
+        np.savez(_npz(path), episodes=self.episodes, **self._arrays)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the layers of a saved traffic analytics file.")
+    parser.add_argument('path')
+    args = parser.parse_args()
+    if not os.path.exists(_npz(args.path)):
+        parser.error(f"{_npz(args.path)} does not exist")
+
+    stats = TrafficStats.load(args.path)
+    print(f"{stats.episodes} episodes on a {stats.shape[0]}x{stats.shape[1]} grid")
+    for name in LAYERS:
+        layer = stats[name]
+        x, y = np.unravel_index(layer.argmax(), layer.shape)
+        print(f"\n{name} (total {layer.sum()}, busiest cell ({x}, {y}))")
+        for row in layer:
+            print(' '.join(f'{value:6d}' for value in row))
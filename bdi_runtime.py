@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import asyncio
+import random
+import time
+from collections import deque
+
+from BDI_Agent import BDI_Agent
+
+
+async def no_op(agent, intention):
+    """Default intention executor: does nothing."""
+
+
+class RuntimeMetrics:
+    """Counters for agent cycles and belief-update queue latency."""
+    def __init__(self, latency_samples=10000):
+        self.cycles = 0
+        self.updates = 0
+        self.elapsed = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latencies = deque(maxlen=latency_samples)  # most recent samples for percentiles
+
+    def record_latency(self, latency):
+        self.updates += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latencies.append(latency)
+
+    def summary(self):
+        samples = sorted(self.latencies)
+        p95 = samples[int(0.95 * (len(samples) - 1))] if samples else 0.0
+        return {
+            'cycles': self.cycles,
+            'cycles_per_second': self.cycles / self.elapsed if self.elapsed else 0.0,
+            'updates': self.updates,
+            'latency_mean_ms': 1000 * self.latency_total / self.updates if self.updates else 0.0,
+            'latency_p95_ms': 1000 * p95,
+            'latency_max_ms': 1000 * self.latency_max,
+        }
+
+
+class AgentRuntime:
+    """Hosts many BDI agents and runs their perceive/deliberate/act cycles on asyncio.
+
+    Belief updates are posted to a per-agent queue and applied as one batch
+    at the start of the agent's next cycle. With fairness='round_robin'
+    every agent is cycled each tick; with fairness='event' only agents with
+    pending updates are, oldest first. `cycle_budget` caps the agent cycles
+    per tick (the rest wait for the next tick) and `concurrency` is how many
+    cycles are awaited together.
+    """
+    def __init__(self, agents, executor=no_op, fairness='round_robin',
+                 cycle_budget=None, concurrency=1000, max_batch=None):
+        if fairness not in ('round_robin', 'event'):
+            raise ValueError("fairness must be 'round_robin' or 'event'")
+        self.agents = list(agents)
+        self.executor = executor
+        self.fairness = fairness
+        self.cycle_budget = cycle_budget
+        self.concurrency = concurrency
+        self.max_batch = max_batch
+        self.queues = [deque() for _ in self.agents]
+        self.ready = deque()      # agents with pending updates, in arrival order ('event')
+        self.queued = set()       # agents currently in self.ready
+        self.next_agent = 0       # round-robin position carried across ticks
+        self.metrics = RuntimeMetrics()
+
+    def post(self, agent_id, update):
+        """Queue a belief update (a dict) for an agent."""
+        self.queues[agent_id].append((time.perf_counter(), update))
+        if self.fairness == 'event' and agent_id not in self.queued:
+            self.queued.add(agent_id)
+            self.ready.append(agent_id)
+
+    def perceive(self, agent_id):
+        """Apply the queued updates of an agent as one merged update_beliefs call."""
+        queue = self.queues[agent_id]
+        if not queue:
+            return
+        count = len(queue) if self.max_batch is None else min(len(queue), self.max_batch)
+        now = time.perf_counter()
+        merged = {}
+        for _ in range(count):
+            posted, update = queue.popleft()
+            merged.update(update)
+            self.metrics.record_latency(now - posted)
+        self.agents[agent_id].update_beliefs(merged)
+
+    async def cycle(self, agent_id):
+        agent = self.agents[agent_id]
+        self.perceive(agent_id)
+        agent.generate_intentions()
+        for intention in agent.intentions:
+            await self.executor(agent, intention)
+        self.metrics.cycles += 1
+
+    def schedule(self):
+        """Agent ids to cycle this tick, according to fairness and cycle budget."""
+        budget = len(self.agents) if self.cycle_budget is None else self.cycle_budget
+        if self.fairness == 'event':
+            batch = []
+            while self.ready and len(batch) < budget:
+                agent_id = self.ready.popleft()
+                self.queued.discard(agent_id)
+                batch.append(agent_id)
+            return batch
+        n = len(self.agents)
+        start = self.next_agent
+        count = min(budget, n)
+        self.next_agent = (start + count) % n if n else 0
+        return [(start + i) % n for i in range(count)]
+
+    async def tick(self):
+        batch = self.schedule()
+        for i in range(0, len(batch), self.concurrency):
+            await asyncio.gather(*(self.cycle(a) for a in batch[i:i + self.concurrency]))
+        if self.fairness == 'event':
+            # agents left with updates (max_batch) go to the back of the line
+            for agent_id in batch:
+                if self.queues[agent_id] and agent_id not in self.queued:
+                    self.queued.add(agent_id)
+                    self.ready.append(agent_id)
+        return len(batch)
+
+    async def run(self, ticks=None, duration=None):
+        """Run ticks until `ticks` are done or `duration` seconds have passed."""
+        start = time.perf_counter()
+        done = 0
+        while (ticks is None or done < ticks) and (duration is None or time.perf_counter() - start < duration):
+            await self.tick()
+            done += 1
+            await asyncio.sleep(0)  # let producers post updates
+        self.metrics.elapsed += time.perf_counter() - start
+        return self.metrics.summary()
+
+
+async def _demo(num_agents=20000, ticks=20):
+    agents = [BDI_Agent({"location": "home", "weather": "sunny"},
+                        ["go for a walk", "read a book"], verbose=False)
+              for _ in range(num_agents)]
+    runtime = AgentRuntime(agents, fairness='event', cycle_budget=num_agents // 2)
+
+    async def weather_feed():
+        while True:
+            for agent_id in random.sample(range(num_agents), num_agents // 10):
+                runtime.post(agent_id, {"weather": random.choice(["sunny", "rainy"])})
+            await asyncio.sleep(0.01)
+
+    for agent_id in range(num_agents):
+        runtime.post(agent_id, {})
+    feed = asyncio.ensure_future(weather_feed())
+    summary = await runtime.run(ticks=ticks)
+    feed.cancel()
+    return summary
+
+
+if __name__ == "__main__":
+    summary = asyncio.run(_demo())
+    print(f"Agents cycled per second: {summary['cycles_per_second']:,.0f}")
+    print(f"Belief updates applied:   {summary['updates']:,}")
+    print(f"Queue latency (ms):       mean {summary['latency_mean_ms']:.1f}, "
+          f"p95 {summary['latency_p95_ms']:.1f}, max {summary['latency_max_ms']:.1f}")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+"""Benchmarks for the pathfinding, auction and robot simulations.
+
+    python benchmark.py                              # quick suite, print results
+    python benchmark.py --suite full --save baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'Auctions'))
+
+import Cleaning_Robots
+import Collect_Gold_RV
+import simulation
+
+SUITES = {
+    'quick': {
+        'astar_sizes': [9, 64, 256],
+        'densities': [0.0, 0.2],
+        'auction_sizes': [2, 10, 100],
+        'episodes': 20,
+    },
+    'full': {
+        # a 1024x1024 search takes tens of seconds in pure Python; larger
+        # grids would make the suite take hours
+        'astar_sizes': [9, 64, 256, 1024],
+        'densities': [0.0, 0.1, 0.2, 0.3],
+        'auction_sizes': [2, 10, 100, 1000],
+        'episodes': 200,
+    },
+}
+
+
+class BenchBidder:
+    """Sincere bidder with a unique name, so any number can join an auction."""
+    def __init__(self, index):
+        self.index = index
+        self.remaining_money = 0
+        self.value = 0
+
+    def name(self):
+        return f"Bench Bidder {self.index}"
+
+    def set_num_auctions(self, num_auctions):
+        pass
+
+    def set_money(self, money):
+        self.remaining_money = money
+
+    def won(self, price):
+        self.remaining_money -= price
+
+    def set_value(self, value):
+        self.value = value
+
+    def interested(self, price, active_strats):
+        return price <= self.value and price <= self.remaining_money
+
+
+def random_grid(size, density):
+    """Square grid with obstacles at the given density; the corners are kept free."""
+    grid = [['#' if random.random() < density else '.' for _ in range(size)] for _ in range(size)]
+    grid[0][0] = grid[size - 1][size - 1] = '.'
+    return grid
+
+
+def astar_workload(size, density):
+    grid = random_grid(size, density)
+    return lambda: Collect_Gold_RV.astar(0, 0, size - 1, size - 1, grid)
+
+
+def auction_workload(num_strategies, auction_type):
+    def run():
+        strategies = [BenchBidder(i) for i in range(num_strategies)]
+        simulation.simulate_multiple(strategies, auction_type, count=100)
+    return run
+
+
+def gold_workload(episodes):
+    def run():
+        for _ in range(episodes):
+            Collect_Gold_RV.environment = Collect_Gold_RV.setup_environment()
+            Collect_Gold_RV.r1.move_to(*Collect_Gold_RV.DEPOT_POSITION)
+            Collect_Gold_RV.simulate()
+    return run
+
+
+def cleaning_workload(episodes):
+    def run():
+        for _ in range(episodes):
+            Cleaning_Robots.environment = Cleaning_Robots.setup_environment()
+            Cleaning_Robots.r1.x, Cleaning_Robots.r1.y = 0, 0
+            Cleaning_Robots.simulate()
+    return run
+
+
+def workloads(suite):
+    """Yield (name, setup) pairs; setup() builds the inputs and returns the timed callable."""
+    config = SUITES[suite]
+    for size in config['astar_sizes']:
+        for density in config['densities']:
+            yield f'astar/{size}x{size}/density={density}', lambda s=size, d=density: astar_workload(s, d)
+    for n in config['auction_sizes']:
+        for auction_type in ('english', 'dutch'):
+            yield f'auction/{auction_type}/strategies={n}', lambda n=n, t=auction_type: auction_workload(n, t)
+    yield f'episode/gold/x{config["episodes"]}', lambda: gold_workload(config['episodes'])
+    yield f'episode/cleaning/x{config["episodes"]}', lambda: cleaning_workload(config['episodes'])
+
+
+def measure(setup, repeats, seed=0, budget=None):
+    """Median and minimum wall time of `repeats` runs, each from the same seed.
+
+    With a budget (seconds), no further run is started once the runs so
+    far, setup included, took that long; there is always at least one run.
+    """
+    times = []
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeats):
+            if times and budget is not None and time.perf_counter() - started >= budget:
+                break
+            random.seed(seed)
+            fn = setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': len(times)}
+
+
+def run_suite(suite, repeats, pattern=None, budget=None):
+    results = {}
+    for name, setup in workloads(suite):
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup, repeats, budget=budget)
+        print(f'{name:45} {1000 * results[name]["median"]:12.3f} ms')
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; return the names that regressed."""
+    regressions = []
+    print(f'\n{"workload":45} {"baseline ms":>12} {"current ms":>12} {"change":>8}')
+    for name, current in results.items():
+        if name not in baseline:
+            print(f'{name:45} {"-":>12} {1000 * current["median"]:12.3f} {"new":>8}')
+            continue
+        before = baseline[name]['median']
+        change = current['median'] / before - 1 if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:45} {1000 * before:12.3f} {1000 * current["median"]:12.3f} {change:+8.1%}{flag}')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', choices=SUITES, default='quick')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=30.0, metavar='SECONDS',
+                        help='stop repeating a workload after this long (default 30, 0 for no limit)')
+    parser.add_argument('--filter', help='only run workloads whose name contains this text')
+    parser.add_argument('--save', metavar='FILE', help='write the results to a JSON baseline file')
+    parser.add_argument('--compare', metavar='FILE', help='compare against a JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown reported as a regression (default 0.10)')
+    args = parser.parse_args()
+
+    results = run_suite(args.suite, args.repeats, args.filter, args.budget or None)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.platform(),
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'suite': args.suite,
+                'results': results,
+            }, f, indent=2)
+        print(f'\nBaseline written to {args.save}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} workload(s) slower than the baseline by more than {args.threshold:.0%}')
+            sys.exit(1)
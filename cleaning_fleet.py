@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""Fleet mode for the cleaning robots.
+
+K cleaning robots share the grid. The garbage is split into K balanced
+regions (k-means over the garbage positions, or Voronoi cells around the
+robot starts) and every robot plans its route through its own region.
+As in Cleaning_Robots.simulate(), a robot carries one piece of garbage at
+a time to the burning robot at the centre, moving with move_towards(), so
+a leg takes max(|dx|, |dy|) steps.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import Cleaning_Robots
+
+
+def steps(a, b):
+    """Number of move_towards() steps from a to b (diagonal moves allowed)."""
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+def robot_starts(grid_size, k):
+    """K start cells spread evenly along the border, beginning at the north-west corner."""
+    side = grid_size - 1
+    perimeter = [(0, y) for y in range(side)] + [(x, side) for x in range(side)] + \
+                [(side, y) for y in range(side, 0, -1)] + [(x, 0) for x in range(side, 0, -1)]
+    return [perimeter[i * len(perimeter) // k] for i in range(k)]
+
+
+def kmeans_regions(points, k, weights, iterations=20, seed=0):
+    """Split points into k regions around k-means centroids with balanced total weight."""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), size=k, replace=False)].astype(np.float64)
+    for _ in range(iterations):
+        labels = np.abs(points[:, None, :] - centroids[None, :, :]).max(axis=2).argmin(axis=1)
+        for c in range(k):
+            members = points[labels == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+
+    # balanced assignment: points that lose most by not getting their nearest
+    # centroid choose first; a region is full at its share of the total weight
+    distances = np.abs(points[:, None, :] - centroids[None, :, :]).max(axis=2)
+    preference = np.argsort(distances, axis=1)
+    ordered = np.sort(distances, axis=1)
+    regret = ordered[:, 1] - ordered[:, 0] if k > 1 else np.zeros(len(points))
+    capacity = weights.sum() / k
+    loads = np.zeros(k)
+    labels = np.empty(len(points), dtype=np.int64)
+    for i in np.argsort(-regret):
+        for c in preference[i]:
+            if loads[c] + weights[i] <= capacity:
+                break
+        else:
+            c = loads.argmin()
+        labels[i] = c
+        loads[c] += weights[i]
+    return labels, centroids
+
+
+def voronoi_regions(points, starts):
+    """Assign every point to the nearest robot start."""
+    starts = np.array(starts)
+    return np.abs(points[:, None, :] - starts[None, :, :]).max(axis=2).argmin(axis=1)
+
+
+def match_robots(centroids, starts):
+    """Give every region to a distinct robot, nearest pairs first."""
+    pairs = sorted((steps(tuple(c), s), r, i) for i, c in enumerate(centroids) for r, s in enumerate(starts))
+    region_of_robot, taken = {}, set()
+    for _, robot, region in pairs:
+        if robot not in region_of_robot and region not in taken:
+            region_of_robot[robot] = region
+            taken.add(region)
+    return region_of_robot
+
+
+def plan_route(start, garbage, burner):
+    """Order the garbage of one robot and count the steps of its route.
+
+    Every piece is carried to the burner on its own, so only the first
+    pickup depends on the start: take the one saving most on the way out,
+    then the rest by distance from the burner.
+    """
+    if not garbage:
+        return [], 0
+    first = min(garbage, key=lambda g: steps(start, g) - steps(g, burner))
+    rest = sorted((g for g in garbage if g != first), key=lambda g: steps(g, burner))
+    total = steps(start, first) + steps(first, burner) + sum(2 * steps(g, burner) for g in rest)
+    return [first] + rest, total
+
+
+def plan_fleet(garbage, grid_size, k, partition='kmeans'):
+    """Routes for k robots; returns a list of (start, route, steps) per robot."""
+    burner = (grid_size // 2, grid_size // 2)
+    starts = robot_starts(grid_size, k)
+    points = np.array(garbage, dtype=np.int64).reshape(-1, 2)
+
+    if len(points) < k:
+        labels = np.arange(len(points))
+        region_of_robot = {r: r for r in range(k)}
+    elif partition == 'kmeans':
+        # a piece costs a round trip to the burner, so balance on that
+        weights = 2 * np.abs(points - np.array(burner)).max(axis=1)
+        labels, centroids = kmeans_regions(points, k, weights)
+        region_of_robot = match_robots(centroids, starts)
+    else:
+        labels = voronoi_regions(points, starts)
+        region_of_robot = {r: r for r in range(k)}
+
+    regions = [[tuple(map(int, p)) for p in points[labels == region_of_robot[r]]] for r in range(k)]
+    # a route is one sort of its region: cheaper than sending it to another process
+    plans = [plan_route(s, g, burner) for s, g in zip(starts, regions)]
+    return [(start, route, total) for start, (route, total) in zip(starts, plans)]
+
+
+def garbage_positions(grid):
+    return [(x, y) for x, row in enumerate(grid) for y, cell in enumerate(row) if cell == 'G']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan a fleet of cleaning robots and report makespan versus K.")
+    parser.add_argument('--grid-size', type=int, default=1000)
+    parser.add_argument('--garbage', type=int, default=10000)
+    parser.add_argument('--robots', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--partition', choices=['kmeans', 'voronoi'], default='kmeans')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    grid = Cleaning_Robots.setup_environment(args.grid_size, args.garbage)
+    garbage = garbage_positions(grid)
+
+    print(f"{args.grid_size}x{args.grid_size} grid, {len(garbage)} pieces of garbage, {args.partition} regions")
+    print(f"speedup is relative to K={args.robots[0]}, balance is makespan / mean route length")
+    print(f"{'K':>4} {'makespan':>12} {'total steps':>12} {'speedup':>8} {'balance':>8} {'plan s':>8}")
+    first_makespan = None
+    for k in args.robots:
+        start = time.perf_counter()
+        fleet = plan_fleet(garbage, args.grid_size, k, args.partition)
+        elapsed = time.perf_counter() - start
+        totals = [total for _, _, total in fleet]
+        makespan = max(totals)
+        first_makespan = first_makespan or makespan
+        speedup = first_makespan / makespan
+        balance = makespan / (sum(totals) / k) if sum(totals) else 1.0
+        print(f"{k:>4} {makespan:>12} {sum(totals):>12} {speedup:>8.2f} {balance:>8.2f} {elapsed:>8.2f}")
@@ -1,12 +1,182 @@
 #!/usr/bin/env python3
 
+import csv
+
+import numpy as np
+
 class Employee:
     def set_name(self, new_name):
         self.name = new_name
 
     def set_salary(self, new_salary):
-        self.salary = new_salary 
-  
-emp = Employee()
-emp.set_name('Korel Rossi')
-emp.set_salary(50000)
\ No newline at end of file
+        self.salary = new_salary
+
+class EmployeeRow:
+    """View of one record of an EmployeeTable, with the same setters as Employee."""
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def name(self):
+        return self.table.name(self.index)
+
+    @property
+    def salary(self):
+        return float(self.table.salaries[self.index])
+
+    def set_name(self, new_name):
+        self.table.set_name(self.index, new_name)
+
+    def set_salary(self, new_salary):
+        self.table.salaries[self.index] = new_salary
+
+    def __repr__(self):
+        return f"EmployeeRow({self.name!r}, {self.salary})"
+
+class EmployeeTable:
+    """Columnar store of employee records.
+
+    Names are UTF-8 encoded one after the other in a single byte buffer;
+    a record holds an int64 offset and an int32 length into it next to a
+    float64 salary. That is 20 bytes per record plus the bytes of its
+    name, about 35 bytes for a 15 character ASCII name, repeated or not.
+    Renaming a record appends the new name, the old bytes stay unused.
+    """
+    def __init__(self, capacity=1024):
+        self._buffer = bytearray()
+        self._starts = np.empty(capacity, dtype=np.int64)
+        self._lengths = np.empty(capacity, dtype=np.int32)
+        self._salaries = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not -self.size <= index < self.size:
+            raise IndexError("employee index out of range")
+        return EmployeeRow(self, index % self.size)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield EmployeeRow(self, index)
+
+    @property
+    def salaries(self):
+        return self._salaries[:self.size]
+
+    def name(self, index):
+        start = self._starts[index]
+        return self._buffer[start:start + self._lengths[index]].decode()
+
+    def names(self):
+        """All names, in record order."""
+        return [self.name(index) for index in range(self.size)]
+
+    def _store(self, names):
+        """Append encoded names to the buffer; returns their offsets and lengths."""
+        encoded = [name.encode() for name in names]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int32, count=len(encoded))
+        starts = np.empty(len(encoded), dtype=np.int64)
+        if len(encoded):
+            starts[0] = len(self._buffer)
+            np.cumsum(lengths[:-1], out=starts[1:])
+            starts[1:] += len(self._buffer)
+        self._buffer += b''.join(encoded)
+        return starts, lengths
+
+    def set_name(self, index, new_name):
+        (self._starts[index],), (self._lengths[index],) = self._store([new_name])
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self._salaries):
+            return
+        capacity = max(needed, 2 * len(self._salaries))
+        self._starts = np.resize(self._starts, capacity)
+        self._lengths = np.resize(self._lengths, capacity)
+        self._salaries = np.resize(self._salaries, capacity)
+
+    def append(self, name, salary):
+        self.extend([name], [salary])
+        return EmployeeRow(self, self.size - 1)
+
+    def extend(self, names, salaries):
+        """Append many records at once."""
+        starts, lengths = self._store(names)
+        self._reserve(len(starts))
+        end = self.size + len(starts)
+        self._starts[self.size:end] = starts
+        self._lengths[self.size:end] = lengths
+        self._salaries[self.size:end] = salaries
+        self.size = end
+
+    @classmethod
+    def load_csv(cls, path, name_field='name', salary_field='salary', chunk_size=100000):
+        """Stream a CSV file with a header row into a new table, chunk by chunk."""
+        table = cls()
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            names, salaries = [], []
+            for record in reader:
+                names.append(record[name_field])
+                salaries.append(float(record[salary_field]))
+                if len(names) == chunk_size:
+                    table.extend(names, salaries)
+                    names, salaries = [], []
+            table.extend(names, salaries)
+        return table
+
+    def mask(self, name):
+        """Boolean mask of the records with this name."""
+        encoded = name.encode()
+        candidates = np.flatnonzero(self._lengths[:self.size] == len(encoded))
+        starts = self._starts[candidates]
+        buffer = np.frombuffer(self._buffer, dtype=np.uint8)
+        for i, byte in enumerate(encoded):
+            keep = buffer[starts + i] == byte
+            candidates, starts = candidates[keep], starts[keep]
+        mask = np.zeros(self.size, dtype=bool)
+        mask[candidates] = True
+        return mask
+
+    def give_raise(self, percent, where=None):
+        """Raise salaries by `percent`, for all records or those selected by a boolean mask."""
+        factor = 1 + percent / 100
+        if where is None:
+            self.salaries[:] *= factor
+        else:
+            self.salaries[where] *= factor
+
+    def total(self):
+        return float(self.salaries.sum())
+
+    def mean(self):
+        """Mean salary; 0.0 for an empty table, like total()."""
+        return float(self.salaries.mean()) if self.size else 0.0
+
+    def percentile(self, q):
+        """Salary at percentile `q` (0-100); 0.0 for an empty table."""
+        return float(np.percentile(self.salaries, q)) if self.size else 0.0
+
+    def bytes_per_record(self):
+        """Column bytes per record plus the name buffer spread over all records."""
+        columns = self._starts.itemsize + self._lengths.itemsize + self._salaries.itemsize
+        return columns + len(self._buffer) / max(self.size, 1)
+
+if __name__ == "__main__":
+    emp = Employee()
+    emp.set_name('Korel Rossi')
+    emp.set_salary(50000)
+
+    table = EmployeeTable()
+    table.extend(['Korel Rossi', 'Ana Lima', 'Korel Rossi'], [50000, 62000, 48000])
+    table[1].set_salary(65000)
+    table.give_raise(10, where=table.mask('Korel Rossi'))
+    for row in table:
+        print(f"{row.name}: {row.salary:.2f}")
+    print(f"total {table.total():.2f}, mean {table.mean():.2f}, median {table.percentile(50):.2f}, "
+          f"{table.bytes_per_record():.1f} bytes per record")
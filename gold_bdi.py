@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""BDI controller for the gold-collecting robot.
+
+Every tick the controller turns what the robot sees (the gold and obstacle
+cells, how much it carries) into beliefs, deliberates if it has to, and
+moves the robot one cell along the path of its current intention.
+
+Deliberation - choosing an intention with BDI_Agent's plan library, then a
+target and an A* path for it - only happens when the committed intention
+can no longer be trusted:
+
+- a belief read by a plan context changed (BDI_Agent marks the desire dirty),
+- the intention is achieved (target reached),
+- its target gold disappeared, or an obstacle appeared on its path.
+
+Changes elsewhere on the map (gold vanishing from other cells, obstacles
+off the path) keep the intention and the cached path.
+
+The grid is scanned once; after that the controller only looks at the
+cells changed through set_cell() and the cells the robot picked from.
+"""
+
+import argparse
+import contextlib
+import os
+import random
+
+import Collect_Gold_RV
+from BDI_Agent import BDI_Agent, Plan, PlanLibrary
+from scenario import PACK_MAGIC, load_scenario
+
+COLLECT = "collect gold"
+DELIVER = "deliver gold"
+
+
+def gold_plans():
+    # the contexts read coarse beliefs only, so moving or picking up one of
+    # several pieces does not make the desires dirty
+    return PlanLibrary([
+        Plan(DELIVER, ["loaded", "full", "gold_left"],
+             lambda b: b["loaded"] and (b["full"] or not b["gold_left"]), action=DELIVER),
+        Plan(COLLECT, ["full", "gold_left"],
+             lambda b: not b["full"] and b["gold_left"], action=COLLECT),
+    ])
+
+
+class GoldController:
+    def __init__(self, robot, grid, depot, depot_robot=None, verbose=False):
+        self.robot = robot
+        self.grid = grid
+        self.depot = depot
+        self.depot_robot = depot_robot
+        self.verbose = verbose
+        self.agent = BDI_Agent({}, [DELIVER, COLLECT], gold_plans(), verbose=False)
+        self.gold = {(x, y) for x, row in enumerate(grid) for y, cell in enumerate(row) if cell == 'G'}
+        self.obstacles = {(x, y) for x, row in enumerate(grid) for y, cell in enumerate(row) if cell == '#'}
+        self.changed = []          # cells changed since the last perceive()
+        self.unreachable = set()   # gold A* found no path to, until the obstacles change
+        self.intention = None      # (desire, target cell)
+        self.path = []             # cells still to walk to the target
+        self.ticks = self.moves = self.deliberations = self.delivered = 0
+
+    def set_cell(self, x, y, value):
+        """Change a cell of the grid; the next perceive() sees the change."""
+        self.grid[x][y] = value
+        self.changed.append((x, y))
+
+    def perceive(self):
+        """Update the beliefs; returns True if the current intention is affected."""
+        vanished, blocked, cleared = set(), set(), set()
+        for x, y in self.changed:
+            cell = self.grid[x][y]
+            if cell == 'G':
+                self.gold.add((x, y))
+            elif (x, y) in self.gold:
+                self.gold.remove((x, y))
+                vanished.add((x, y))
+            if cell == '#':
+                if (x, y) not in self.obstacles:
+                    self.obstacles.add((x, y))
+                    blocked.add((x, y))
+            elif (x, y) in self.obstacles:
+                self.obstacles.remove((x, y))
+                cleared.add((x, y))
+        self.changed.clear()
+        if blocked or cleared:
+            self.unreachable.clear()
+
+        self.agent.update_beliefs({
+            "loaded": self.robot.carrying > 0,
+            "full": self.robot.carrying >= self.robot.capacity,
+            "gold_left": not self.gold <= self.unreachable,
+        })
+
+        if self.intention is None or self.agent.dirty:
+            return True
+        desire, target = self.intention
+        return (desire == COLLECT and target in vanished) or not blocked.isdisjoint(self.path)
+
+    def deliberate(self):
+        self.deliberations += 1
+        self.intention, self.path = None, []
+        while True:
+            self.agent.generate_intentions()
+            intentions = self.agent.intentions
+            if DELIVER in intentions:
+                path = Collect_Gold_RV.astar(*self.robot.pos(), *self.depot, self.grid)
+                if path is not None:
+                    self.intention, self.path = (DELIVER, self.depot), path[1:]
+            elif COLLECT in intentions:
+                # nearest reachable gold, by Manhattan distance then by A*
+                x, y = self.robot.pos()
+                for target in sorted(self.gold - self.unreachable, key=lambda g: (abs(g[0] - x) + abs(g[1] - y), g)):
+                    path = Collect_Gold_RV.astar(x, y, *target, self.grid)
+                    if path is not None:
+                        self.intention, self.path = (COLLECT, target), path[1:]
+                        break
+                    self.unreachable.add(target)
+                if self.intention is None:
+                    # nothing reachable after all: let the plan contexts see it
+                    self.agent.update_beliefs({"gold_left": False})
+                    continue
+            break
+        if self.verbose:
+            print(f"Deliberation {self.deliberations} at tick {self.ticks}: {self.intention}")
+
+    def act(self):
+        """Move one cell, or pick up / drop at the target."""
+        if self.path:
+            self.robot.move_to(*self.path.pop(0))
+            self.moves += 1
+            return
+        desire, target = self.intention
+        if desire == COLLECT:
+            self.robot.pick()
+            self.changed.append(target)
+        else:
+            self.delivered += self.robot.carrying
+            self.robot.drop()
+            if self.depot_robot:
+                self.depot_robot.process()
+        self.intention = None   # achieved
+
+    def tick(self):
+        """One perceive-deliberate-act cycle; False once there is nothing left to do."""
+        self.ticks += 1
+        if self.perceive():
+            self.deliberate()
+        if self.intention is None:
+            return False
+        self.act()
+        return True
+
+
+def random_change(controller):
+    """Make an obstacle appear on a free cell or a piece of gold vanish."""
+    grid = controller.grid
+    if controller.gold and random.random() < 0.5:
+        controller.set_cell(*random.choice(sorted(controller.gold)), '.')
+    else:
+        taken = controller.gold | controller.obstacles | {controller.robot.pos(), controller.depot}
+        free = [(x, y) for x in range(len(grid)) for y in range(len(grid[0])) if (x, y) not in taken]
+        if free:
+            controller.set_cell(*random.choice(free), '#')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect gold with a BDI controller and count its deliberations.")
+    parser.add_argument('--episodes', type=int, default=5)
+    parser.add_argument('--capacity', type=int, default=1, help='pieces of gold the robot can carry')
+    parser.add_argument('--changes', type=float, default=0.0, metavar='P',
+                        help='chance per tick that an obstacle appears or a piece of gold vanishes')
+    parser.add_argument('--scenario', metavar='FILE', help='scenario or pack file; pack scenarios are used in turn')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-ticks', type=int, default=10000)
+    parser.add_argument('--verbose', action='store_true', help='print every deliberation')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.scenario:
+        with open(args.scenario, 'rb') as f:
+            is_pack = f.read(len(PACK_MAGIC)) == PACK_MAGIC
+    print(f"{'episode':>7} {'ticks':>6} {'moves':>6} {'delivered':>9} {'deliberations':>13}")
+    total_ticks = total_deliberations = 0
+    for episode in range(args.episodes):
+        if args.scenario:
+            scenario = load_scenario(args.scenario, episode if is_pack else None)
+            grid, depot = [list(row) for row in scenario.grid], scenario.depot
+        else:
+            depot = Collect_Gold_RV.DEPOT_POSITION
+            grid = Collect_Gold_RV.setup_environment(Collect_Gold_RV.GRID_SIZE)
+        # the robots pick from the module's environment
+        Collect_Gold_RV.environment = grid
+        Collect_Gold_RV.DEPOT_POSITION = depot
+        robot = Collect_Gold_RV.CollectingRobot('r1', *depot, capacity=args.capacity)
+        depot_robot = Collect_Gold_RV.DepotRobot('r2', *depot)
+
+        controller = GoldController(robot, grid, depot, depot_robot, args.verbose)
+        # the robots print every pick and drop; keep that for --verbose
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+            while controller.ticks < args.max_ticks and controller.tick():
+                if args.changes and random.random() < args.changes:
+                    random_change(controller)
+        print(f"{episode:>7} {controller.ticks:>6} {controller.moves:>6} "
+              f"{controller.delivered:>9} {controller.deliberations:>13}")
+        total_ticks += controller.ticks
+        total_deliberations += controller.deliberations
+    print(f"{total_deliberations} deliberations in {total_ticks} ticks "
+          f"({total_deliberations / max(total_ticks, 1):.2f} per tick)")
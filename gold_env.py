@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""Gym-style environments for the gold world.
+
+VectorGoldEnv steps B gold worlds in lockstep with array operations, and
+GoldEnv is the single-world version of it. Both follow the gymnasium API
+(reset() -> (observation, info), step() -> (observation, reward,
+terminated, truncated, info)) without depending on gymnasium.
+
+A world is laid out like Collect_Gold_RV.setup_environment(): gold and
+obstacles on distinct random cells, none on the depot, with the robot
+starting at the depot. Actions are
+
+    0-3  move one cell, in get_neighbors() order: +y, +x, -y, -x
+    4    pick up the gold on the robot's cell
+    5    drop everything carried (it only counts at the depot)
+
+Moving into an obstacle or off the grid, and picks and drops that do not
+apply, leave the world unchanged. Every step costs STEP_REWARD and every
+piece dropped at the depot earns DELIVER_REWARD. An episode terminates
+when all gold is delivered and is truncated after max_steps steps.
+
+Observations are dicts of arrays:
+
+    grid      uint8 (3, size, size): gold, obstacle and depot channels
+    position  int64 (2,): robot cell
+    carrying  int64: pieces carried
+
+with an extra leading batch dimension for VectorGoldEnv.
+
+With autoreset, VectorGoldEnv starts a new world as soon as an episode
+ends, so step() returns the first observation of the next episode for
+those environments. As in gymnasium's vector environments, the last
+observation of the finished episode is then in info['final_observation'],
+an object array holding that environment's observation dict (None for the
+others), and info['_final_observation'] is the mask of environments that
+finished. Use it to bootstrap values on truncation.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+MOVES = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)])
+PICK, DROP = 4, 5
+NUM_ACTIONS = 6
+
+STEP_REWARD = -0.01
+DELIVER_REWARD = 1.0
+
+
+class VectorGoldEnv:
+    def __init__(self, num_envs, grid_size=9, gold=5, obstacles=10, capacity=1,
+                 max_steps=200, autoreset=True):
+        if gold + obstacles >= grid_size * grid_size:
+            raise ValueError("too many gold and obstacle cells for the grid")
+        self.num_envs = num_envs
+        self.grid_size = grid_size
+        self.num_gold = gold
+        self.num_obstacles = obstacles
+        self.capacity = capacity
+        self.max_steps = max_steps
+        self.autoreset = autoreset
+        self.depot = (grid_size // 2, grid_size // 2)
+        self.rng = np.random.default_rng()
+
+        shape = (num_envs, grid_size, grid_size)
+        self.gold = np.zeros(shape, dtype=bool)
+        self.obstacles = np.zeros(shape, dtype=bool)
+        self.position = np.zeros((num_envs, 2), dtype=np.int64)
+        self.carrying = np.zeros(num_envs, dtype=np.int64)
+        self.delivered = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self._envs = np.arange(num_envs)
+        self._depot_channel = np.zeros((grid_size, grid_size), dtype=np.uint8)
+        self._depot_channel[self.depot] = 1
+
+    def _generate(self, envs):
+        """New worlds for the environments in `envs` (an index array)."""
+        n, cells = len(envs), self.grid_size * self.grid_size
+        placed = self.num_gold + self.num_obstacles
+        keys = self.rng.random((n, cells))
+        keys[:, self.depot[0] * self.grid_size + self.depot[1]] = 2.0  # never chosen
+        chosen = np.argpartition(keys, placed - 1, axis=1)[:, :placed]
+        gold = np.zeros((n, cells), dtype=bool)
+        obstacles = np.zeros((n, cells), dtype=bool)
+        np.put_along_axis(gold, chosen[:, :self.num_gold], True, axis=1)
+        np.put_along_axis(obstacles, chosen[:, self.num_gold:], True, axis=1)
+        self.gold[envs] = gold.reshape(n, self.grid_size, self.grid_size)
+        self.obstacles[envs] = obstacles.reshape(n, self.grid_size, self.grid_size)
+        self.position[envs] = self.depot
+        self.carrying[envs] = 0
+        self.delivered[envs] = 0
+        self.steps[envs] = 0
+
+    def _observation(self):
+        grid = np.empty((self.num_envs, 3, self.grid_size, self.grid_size), dtype=np.uint8)
+        grid[:, 0] = self.gold
+        grid[:, 1] = self.obstacles
+        grid[:, 2] = self._depot_channel
+        return {'grid': grid, 'position': self.position.copy(), 'carrying': self.carrying.copy()}
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._generate(self._envs)
+        return self._observation(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        envs = self._envs
+        self.steps += 1
+
+        # moves: blocked by the border and by obstacles
+        moving = actions < PICK
+        target = self.position + MOVES[np.where(moving, actions, 0)] * moving[:, None]
+        inside = ((target >= 0) & (target < self.grid_size)).all(axis=1)
+        clipped = np.clip(target, 0, self.grid_size - 1)
+        free = inside & ~self.obstacles[envs, clipped[:, 0], clipped[:, 1]]
+        self.position = np.where(free[:, None], target, self.position)
+        x, y = self.position[:, 0], self.position[:, 1]
+
+        picking = (actions == PICK) & self.gold[envs, x, y] & (self.carrying < self.capacity)
+        self.gold[envs[picking], x[picking], y[picking]] = False
+        self.carrying += picking
+
+        at_depot = (x == self.depot[0]) & (y == self.depot[1])
+        dropped = np.where((actions == DROP) & at_depot, self.carrying, 0)
+        self.delivered += dropped
+        self.carrying -= dropped
+
+        reward = STEP_REWARD + DELIVER_REWARD * dropped
+        terminated = self.delivered == self.num_gold
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        info = {'delivered': self.delivered.copy(), 'steps': self.steps.copy()}
+        done = terminated | truncated
+        if self.autoreset and done.any():
+            final = self._observation()
+            info['final_observation'] = np.empty(self.num_envs, dtype=object)
+            for env in envs[done]:
+                info['final_observation'][env] = {key: value[env] for key, value in final.items()}
+            info['_final_observation'] = done
+            self._generate(envs[done])
+        return self._observation(), reward, terminated, truncated, info
+
+
+class GoldEnv:
+    """A single gold world; call reset() again once an episode has ended."""
+
+    def __init__(self, grid_size=9, gold=5, obstacles=10, capacity=1, max_steps=200):
+        self.vector = VectorGoldEnv(1, grid_size, gold, obstacles, capacity, max_steps, autoreset=False)
+
+    @staticmethod
+    def _single(observation):
+        return {key: value[0] for key, value in observation.items()}
+
+    def reset(self, seed=None):
+        observation, info = self.vector.reset(seed)
+        return self._single(observation), info
+
+    def step(self, action):
+        observation, reward, terminated, truncated, info = self.vector.step([action])
+        info = {key: value[0] for key, value in info.items()}
+        return self._single(observation), float(reward[0]), bool(terminated[0]), bool(truncated[0]), info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the step rate of the vectorized gold environment.")
+    parser.add_argument('--envs', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=1000, help='lockstep steps to run')
+    parser.add_argument('--grid-size', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    env = VectorGoldEnv(args.envs, args.grid_size)
+    env.reset(seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    episodes = delivered = 0
+    for _ in range(args.steps):
+        _, reward, terminated, truncated, info = env.step(rng.integers(0, NUM_ACTIONS, args.envs))
+        done = terminated | truncated
+        episodes += done.sum()
+        delivered += info['delivered'][done].sum()
+    elapsed = time.perf_counter() - start
+    total = args.envs * args.steps
+    print(f"{args.envs} envs x {args.steps} steps, random policy: "
+          f"{total / elapsed:,.0f} env steps/s, {episodes} episodes, {delivered} gold delivered")
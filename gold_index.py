@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""Spatial index of the gold on a grid.
+
+The grid is cut into square buckets of `bucket` x `bucket` cells and every
+bucket holds the gold inside it. add() and remove() touch one bucket, and
+nearest() searches rings of buckets outwards from the query cell, stopping
+once no unsearched bucket can hold anything closer. Distances are
+Manhattan distances, the A* heuristic, so obstacles are not taken into
+account.
+"""
+
+
+class GoldIndex:
+    def __init__(self, grid_size, bucket=4):
+        self.bucket = bucket
+        self.buckets_per_side = (grid_size + bucket - 1) // bucket
+        self.buckets = {}   # (bucket x, bucket y) -> set of gold positions
+        self.size = 0
+
+    @classmethod
+    def from_grid(cls, grid, bucket=4):
+        index = cls(max(len(grid), len(grid[0])), bucket)
+        for x, row in enumerate(grid):
+            for y, cell in enumerate(row):
+                if cell == 'G':
+                    index.add((x, y))
+        return index
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, pos):
+        return pos in self.buckets.get(self._key(pos), ())
+
+    def __iter__(self):
+        for cells in self.buckets.values():
+            yield from cells
+
+    def _key(self, pos):
+        return pos[0] // self.bucket, pos[1] // self.bucket
+
+    def add(self, pos):
+        cells = self.buckets.setdefault(self._key(pos), set())
+        if pos not in cells:
+            cells.add(pos)
+            self.size += 1
+
+    def remove(self, pos):
+        key = self._key(pos)
+        cells = self.buckets.get(key)
+        if cells and pos in cells:
+            cells.remove(pos)
+            self.size -= 1
+            if not cells:
+                del self.buckets[key]
+
+    def nearest(self, x, y):
+        """Closest gold to (x, y), ties broken by position; None if there is none."""
+        if not self.size:
+            return None
+        bx, by = self._key((x, y))
+        best = None
+        for ring in range(self.buckets_per_side + 1):
+            # cells in buckets of this ring are more than (ring - 1) * bucket away
+            if best and best[0] <= (ring - 1) * self.bucket:
+                break
+            for key in self._ring(bx, by, ring):
+                for gx, gy in self.buckets.get(key, ()):
+                    candidate = (abs(gx - x) + abs(gy - y), gx, gy)
+                    if best is None or candidate < best:
+                        best = candidate
+        return best[1], best[2]
+
+    @staticmethod
+    def _ring(bx, by, ring):
+        """Bucket keys at Chebyshev distance `ring` from (bx, by)."""
+        if ring == 0:
+            yield bx, by
+            return
+        for i in range(-ring, ring + 1):
+            yield bx + i, by - ring
+            yield bx + i, by + ring
+        for i in range(-ring + 1, ring):
+            yield bx - ring, by + i
+            yield bx + ring, by + i
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""Capacitated trip planning for the gold robots.
+
+A robot that can carry `capacity` pieces of gold leaves the depot, picks up
+to that many pieces and returns. plan_trips() groups the gold into trips
+with the Clarke-Wright savings algorithm and improves them with 2-opt
+inside each trip and relocation between trips, all on BFS distances
+through the grid (so obstacles are respected).
+"""
+
+from collections import deque
+
+INF = float('inf')
+
+
+def bfs_distances(grid, source):
+    """Steps from source to every cell (INF for obstacles and unreachable cells)."""
+    rows, cols = len(grid), len(grid[0])
+    dist = [[INF] * cols for _ in range(rows)]
+    dist[source[0]][source[1]] = 0
+    queue = deque([source])
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if 0 <= nx < rows and 0 <= ny < cols and grid[nx][ny] != '#' and dist[nx][ny] == INF:
+                dist[nx][ny] = dist[x][y] + 1
+                queue.append((nx, ny))
+    return dist
+
+
+def distance_table(grid, nodes):
+    """Pairwise BFS distances between nodes (node 0 is the depot)."""
+    table = []
+    for node in nodes:
+        dist = bfs_distances(grid, node)
+        table.append([dist[x][y] for x, y in nodes])
+    return table
+
+
+def route_cost(route, dist):
+    """Length of a trip depot -> route -> depot; route holds node indices."""
+    if not route:
+        return 0
+    cost = dist[0][route[0]] + dist[route[-1]][0]
+    for a, b in zip(route, route[1:]):
+        cost += dist[a][b]
+    return cost
+
+
+def savings_routes(dist, capacity):
+    """Clarke-Wright savings: merge trips while the merge saves steps and fits."""
+    customers = [i for i in range(1, len(dist)) if dist[0][i] < INF]
+    routes = {i: [i] for i in customers}     # route id -> node indices
+    route_of = {i: i for i in customers}     # node -> route id
+    savings = sorted(((dist[0][i] + dist[0][j] - dist[i][j], i, j)
+                      for i in customers for j in customers if i < j), reverse=True)
+    for saving, i, j in savings:
+        if saving <= 0:
+            break
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj or len(routes[ri]) + len(routes[rj]) > capacity:
+            continue
+        a, b = routes[ri], routes[rj]
+        # i and j must be at the ends of their trips to be joined
+        if a[-1] != i:
+            a.reverse()
+        if b[0] != j:
+            b.reverse()
+        if a[-1] != i or b[0] != j:
+            continue
+        a.extend(b)
+        for node in b:
+            route_of[node] = ri
+        del routes[rj]
+    return list(routes.values())
+
+
+def two_opt(route, dist):
+    """Reverse segments of a trip while that shortens it."""
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(route) - 1):
+            for j in range(i + 1, len(route)):
+                candidate = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                if route_cost(candidate, dist) < route_cost(route, dist):
+                    route, improved = candidate, True
+    return route
+
+
+def relocate(routes, dist, capacity):
+    """Move single pieces to the best position in another trip while that saves steps."""
+    improved = True
+    while improved:
+        improved = False
+        for a in range(len(routes)):
+            for node in list(routes[a]):
+                source = [n for n in routes[a] if n != node]
+                gain = route_cost(routes[a], dist) - route_cost(source, dist)
+                best = None
+                for b in range(len(routes)):
+                    if b == a or len(routes[b]) >= capacity:
+                        continue
+                    base = route_cost(routes[b], dist)
+                    for pos in range(len(routes[b]) + 1):
+                        target = routes[b][:pos] + [node] + routes[b][pos:]
+                        delta = route_cost(target, dist) - base
+                        if delta < gain and (best is None or delta < best[0]):
+                            best = (delta, b, target)
+                if best:
+                    routes[a] = source
+                    routes[best[1]] = best[2]
+                    improved = True
+        routes = [r for r in routes if r]
+    return routes
+
+
+def plan_trips(grid, depot, gold_positions, capacity):
+    """Group reachable gold into trips of at most `capacity` pieces.
+
+    Returns the trips as lists of gold positions in visiting order.
+    """
+    nodes = [depot] + list(gold_positions)
+    dist = distance_table(grid, nodes)
+    routes = savings_routes(dist, capacity)
+    routes = [two_opt(r, dist) for r in routes]
+    routes = relocate(routes, dist, capacity)
+    routes = [two_opt(r, dist) for r in routes]
+    return [[nodes[i] for i in route] for route in routes]
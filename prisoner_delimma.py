@@ -28,11 +28,29 @@ class TitForTatWithForgiveness:
     def play(self):
         """Decide the next move based on Tit-for-Tat with forgiveness."""
         if self.last_opponent_move == 'D':
-            # Normally defect back, but sometimes forgive
+            # Normally defect back, but sometimes forgive; a rate of 0 or 1
+            # decides without a draw, as state_key() promises
+            if self.forgiveness_rate in (0.0, 1.0):
+                return 'C' if self.forgiveness_rate == 1.0 else 'D'
             if random.random() < self.forgiveness_rate:
                 return 'C'
             return 'D'
         return 'C'  # if opponent cooperated last, cooperate
 
+    def state_key(self):
+        """Hashable state if the next moves are fully determined by it, else None."""
+        if self.forgiveness_rate in (0.0, 1.0):
+            return self.last_opponent_move
+        return None
+
+    def memory_table(self):
+        """Compiled form: (memory, cooperation probabilities, initial history).
+
+        The table is indexed by the packed joint history of the last round
+        (bit 1 = our move, bit 0 = opponent's move, 1 meaning defect).
+        """
+        f = self.forgiveness_rate
+        return 1, (1.0, f, 1.0, f), 0
+
 def create_strategy():
     return TitForTatWithForgiveness()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from prisoner_delimma import TitForTatWithForgiveness
+from prisoner_match import MemoryStrategy, compile_strategy
+from prisoner_numpy import PAYOFF, SWAP, stack_tables
+
+CACHE_DIR = '.pd_cache'
+
+
+def cache_key(strategies, rounds):
+    """Key a payoff matrix by the compiled strategy tables and the round count."""
+    h = hashlib.sha256(f'rounds={rounds}'.encode())
+    for s in map(compile_strategy, strategies):
+        h.update(repr((s.name, s.memory, s.coop_prob, s.initial_history)).encode())
+    return h.hexdigest()[:32]
+
+
+def _transitions(memory):
+    """Next joint state of every joint state (ha, hb), per joint move: shape (4, size**2)."""
+    size = 4 ** memory
+    mask = size - 1
+    ha, hb = np.divmod(np.arange(size * size), size)
+    next_state = np.empty((4, size * size), dtype=np.int64)
+    for joint in range(4):
+        new_a = ((ha << 2) | joint) & mask
+        new_b = ((hb << 2) | SWAP[joint]) & mask
+        next_state[joint] = new_a * size + new_b
+    return ha, hb, next_state
+
+
+def expected_scores(tables, initial, memory, pairs_a, pairs_b, rounds):
+    """Exact expected mean per-round payoffs for the given pairings.
+
+    Each pairing is a Markov chain over the joint state (history of a,
+    history of b), so the expectation is obtained by pushing a distribution
+    through `rounds` steps instead of sampling matches. Each step adds the
+    probability mass of every state and joint move into the next state with
+    one bincount, so a step costs O(pairings * size**2).
+    """
+    size = 4 ** memory
+    states = size * size
+    ha, hb, next_state = _transitions(memory)
+    # flat (pairing, next state) index of every (joint move, pairing, state)
+    index = (np.arange(len(pairs_a))[:, None] * states + next_state[:, None, :]).ravel()
+    # cooperation probability of a and b in every joint state, per pairing
+    pa = tables[pairs_a][:, ha]
+    pb = tables[pairs_b][:, hb]
+    probs = [(1 - pa if joint & 2 else pa) * (1 - pb if joint & 1 else pb) for joint in range(4)]
+
+    dist = np.zeros((len(pairs_a), states))
+    dist[np.arange(len(pairs_a)), initial[pairs_a] * size + initial[pairs_b]] = 1.0
+    score_a = np.zeros(len(pairs_a))
+    score_b = np.zeros(len(pairs_a))
+    weighted = np.empty((4,) + dist.shape)
+    for _ in range(rounds):
+        for joint in range(4):
+            np.multiply(dist, probs[joint], out=weighted[joint])
+        mass = weighted.sum(axis=2)
+        score_a += PAYOFF @ mass
+        score_b += PAYOFF[SWAP] @ mass
+        dist = np.bincount(index, weights=weighted.ravel(), minlength=dist.size).reshape(dist.shape)
+    return score_a / rounds, score_b / rounds
+
+
+def payoff_matrix(strategies, rounds=200, cache_dir=CACHE_DIR, chunk=20000):
+    """Expected mean per-round payoff of strategy i against strategy j.
+
+    The matrix is computed once and cached in `cache_dir`, keyed by the
+    strategy tables and the number of rounds.
+    """
+    path = os.path.join(cache_dir, f'payoff_{cache_key(strategies, rounds)}.npy') if cache_dir else None
+    if path and os.path.exists(path):
+        return np.load(path)
+
+    memory, tables, initial = stack_tables(strategies)
+    n = len(strategies)
+    pairs_a, pairs_b = np.triu_indices(n)
+    matrix = np.zeros((n, n))
+    for start in range(0, len(pairs_a), chunk):
+        a = pairs_a[start:start + chunk]
+        b = pairs_b[start:start + chunk]
+        score_a, score_b = expected_scores(tables, initial, memory, a, b, rounds)
+        matrix[a, b] = score_a
+        matrix[b, a] = score_b
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(path, matrix)
+    return matrix
+
+
+def replicator(matrix, shares, generations=1000):
+    """Discrete-time replicator dynamics; returns the shares of every generation."""
+    x = np.asarray(shares, dtype=np.float64)
+    x = x / x.sum()
+    history = np.empty((generations + 1, len(x)))
+    history[0] = x
+    for g in range(1, generations + 1):
+        fitness = matrix @ x
+        x = x * fitness / (x @ fitness)
+        history[g] = x
+    return history
+
+
+def moran(matrix, counts, generations=1000, selection=1.0, seed=None):
+    """Frequency-dependent Moran process on a finite population.
+
+    Fitness comes from the payoff matrix against the rest of the population
+    (self-play excluded). One generation is `population` birth-death events;
+    the payoff vector is kept up to date with one column update per event.
+    Returns the counts of every generation.
+    """
+    rng = np.random.default_rng(seed)
+    n = np.asarray(counts, dtype=np.int64).copy()
+    population = n.sum()
+    diag = np.diag(matrix)
+    payoffs = matrix @ n
+    history = np.empty((generations + 1, len(n)), dtype=np.int64)
+    history[0] = n
+    for g in range(1, generations + 1):
+        for _ in range(population):
+            fitness = 1 - selection + selection * (payoffs - diag) / (population - 1)
+            weights = n * fitness
+            born = rng.choice(len(n), p=weights / weights.sum())
+            dies = rng.choice(len(n), p=n / population)
+            if born != dies:
+                n[born] += 1
+                n[dies] -= 1
+                payoffs += matrix[:, born] - matrix[:, dies]
+        history[g] = n
+        if (n == population).any():  # fixation
+            history[g + 1:] = n
+            break
+    return history
+
+
+if __name__ == '__main__':
+    rates = np.linspace(0.0, 1.0, 101)
+    strategies = [TitForTatWithForgiveness(r) for r in rates]
+    strategies.append(MemoryStrategy(0, [0.0], name='Always Defect'))
+    strategies.append(MemoryStrategy(0, [0.5], name='Random'))
+    labels = [f'forgiveness {r:.2f}' for r in rates] + ['always defect', 'random']
+
+    start = time.perf_counter()
+    matrix = payoff_matrix(strategies, rounds=200)
+    print(f'payoff matrix {matrix.shape} in {time.perf_counter() - start:.2f}s')
+
+    start = time.perf_counter()
+    shares = replicator(matrix, np.ones(len(strategies)), generations=5000)
+    print(f'5000 replicator generations in {time.perf_counter() - start:.2f}s')
+    top = np.argsort(shares[-1])[::-1][:5]
+    for i in top:
+        print(f'\t{labels[i]}: share {shares[-1][i]:.3f}')
+
+    counts = np.zeros(len(strategies), dtype=np.int64)
+    counts[[0, 10, 50, 100, 101, 102]] = 20
+    history = moran(matrix, counts, generations=200, seed=0)
+    print('Moran process after 200 generations:')
+    for i in np.nonzero(history[-1])[0]:
+        print(f'\t{labels[i]}: {history[-1][i]} individuals')
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import random
+
+# Payoffs (mine, other's) for each pair of moves
+PAYOFFS = {
+    ('C', 'C'): (3, 3),
+    ('C', 'D'): (0, 5),
+    ('D', 'C'): (5, 0),
+    ('D', 'D'): (1, 1),
+}
+
+
+class MemoryStrategy:
+    """Table-driven memory-n strategy, the compiled form of a strategy.
+
+    coop_prob[h] is the probability of cooperating when the packed joint
+    history of the last `memory` rounds is h. Every round takes two bits,
+    the most recent round in the lowest bits: bit 1 is our own move and
+    bit 0 the opponent's, 1 meaning defect.
+    """
+
+    def __init__(self, memory, coop_prob, initial_history=0, name="Memory Strategy"):
+        if len(coop_prob) != 4 ** memory:
+            raise ValueError(f"memory-{memory} table needs {4 ** memory} entries, got {len(coop_prob)}")
+        self.memory = memory
+        self.coop_prob = tuple(float(p) for p in coop_prob)
+        self.initial_history = initial_history
+        self.name = name
+        self.mask = 4 ** memory - 1
+        self.history = initial_history
+
+    def strategy_name(self):
+        return self.name
+
+    def reset(self):
+        """Reset strategy state before a new match."""
+        self.history = self.initial_history
+
+    def last_move(self, my_move, other_move):
+        """Shift the joint move into the packed history."""
+        joint = ((my_move == 'D') << 1) | (other_move == 'D')
+        self.history = ((self.history << 2) | joint) & self.mask
+
+    def play(self):
+        p = self.coop_prob[self.history]
+        if p >= 1.0:
+            return 'C'
+        if p <= 0.0:
+            return 'D'
+        return 'C' if random.random() < p else 'D'
+
+    def state_key(self):
+        """Hashable state if the next moves are fully determined by it, else None."""
+        return self.history if self.is_deterministic() else None
+
+    def is_deterministic(self):
+        return all(p in (0.0, 1.0) for p in self.coop_prob)
+
+    def expand(self, memory):
+        """Return the same strategy as an equivalent table with a longer memory."""
+        if memory < self.memory:
+            raise ValueError("cannot shrink the memory of a strategy")
+        table = [self.coop_prob[h & self.mask] for h in range(4 ** memory)]
+        return MemoryStrategy(memory, table, self.initial_history, self.name)
+
+
+def compile_strategy(strategy):
+    """Turn a strategy exposing memory_table() into a MemoryStrategy."""
+    if isinstance(strategy, MemoryStrategy):
+        return strategy
+    memory, coop_prob, initial_history = strategy.memory_table()
+    return MemoryStrategy(memory, coop_prob, initial_history, strategy.strategy_name())
+
+
+def _state_key(strategy):
+    state_key = getattr(strategy, 'state_key', None)
+    return state_key() if state_key else None
+
+
+def play_match(strategy_a, strategy_b, rounds=200, detect_cycles=True):
+    """Play one match between two strategy objects and return both scores.
+
+    This is the reference engine: one play()/last_move() call per player
+    and round. If both strategies report a deterministic state_key(), the
+    joint state is remembered each round; once it repeats, the match is in
+    a cycle and the payoff of the whole cycles left is added in one step.
+    Only the last partial cycle is played, so both strategies still end in
+    the state they would have after all `rounds`.
+    """
+    strategy_a.reset()
+    strategy_b.reset()
+    score_a = score_b = 0
+    seen = {}  # joint state -> (round, score_a, score_b) when first seen
+    current_round = 0
+    while current_round < rounds:
+        if detect_cycles:
+            key_a, key_b = _state_key(strategy_a), _state_key(strategy_b)
+            if key_a is None or key_b is None:
+                seen.clear()
+            else:
+                key = (key_a, key_b)
+                if key in seen:
+                    start, start_a, start_b = seen[key]
+                    length = current_round - start
+                    cycles = (rounds - current_round) // length
+                    score_a += cycles * (score_a - start_a)
+                    score_b += cycles * (score_b - start_b)
+                    current_round += cycles * length
+                    detect_cycles = False
+                    continue
+                seen[key] = (current_round, score_a, score_b)
+
+        move_a = strategy_a.play()
+        move_b = strategy_b.play()
+        strategy_a.last_move(move_a, move_b)
+        strategy_b.last_move(move_b, move_a)
+        pay_a, pay_b = PAYOFFS[(move_a, move_b)]
+        score_a += pay_a
+        score_b += pay_b
+        current_round += 1
+    return score_a, score_b
+
+
+def check_cycle_skipping(strategy_a, strategy_b, rounds=200, seed=0):
+    """True if skipping cycles gives the scores of playing every round.
+
+    The random state after the match must match too, so that a seeded
+    tournament does not depend on detect_cycles.
+    """
+    results = []
+    for detect_cycles in (True, False):
+        random.seed(seed)
+        scores = play_match(strategy_a, strategy_b, rounds, detect_cycles)
+        results.append((scores, random.getstate()))
+    return results[0] == results[1]
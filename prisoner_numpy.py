@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from prisoner_delimma import TitForTatWithForgiveness
+from prisoner_match import MemoryStrategy, check_cycle_skipping, compile_strategy, play_match
+
+# Payoff of the first player indexed by the joint move (bit 1 = first player
+# defected, bit 0 = second player defected), same values as prisoner_match.PAYOFFS
+PAYOFF = np.array([3, 0, 5, 1], dtype=np.int64)
+# The same joint move seen from the other player's side
+SWAP = np.array([0, 2, 1, 3], dtype=np.int64)
+
+
+def stack_tables(strategies, memory=None):
+    """Compile strategies into one (n, 4**memory) table and their initial histories."""
+    compiled = [compile_strategy(s) for s in strategies]
+    if memory is None:
+        memory = max(s.memory for s in compiled)
+    compiled = [s.expand(memory) for s in compiled]
+    tables = np.array([s.coop_prob for s in compiled], dtype=np.float64)
+    initial = np.array([s.initial_history for s in compiled], dtype=np.int64)
+    return memory, tables, initial
+
+
+def play_tables(tables_a, init_a, tables_b, init_b, memory, rounds, rng=None):
+    """Play len(init_a) matches in lockstep and return both score arrays.
+
+    Row i of tables_a/tables_b is the strategy used in match i; a table with
+    a single row is shared by all matches.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n = len(init_a)
+    mask = 4 ** memory - 1
+    ha = init_a.astype(np.int64)
+    hb = init_b.astype(np.int64)
+    score_a = np.zeros(n, dtype=np.int64)
+    score_b = np.zeros(n, dtype=np.int64)
+    rows_a = np.zeros(n, dtype=np.int64) if len(tables_a) == 1 else np.arange(n)
+    rows_b = np.zeros(n, dtype=np.int64) if len(tables_b) == 1 else np.arange(n)
+    deterministic = bool(np.isin(tables_a, (0.0, 1.0)).all() and np.isin(tables_b, (0.0, 1.0)).all())
+
+    for _ in range(rounds):
+        pa = tables_a[rows_a, ha]
+        pb = tables_b[rows_b, hb]
+        if deterministic:
+            da = (pa < 1.0).astype(np.int64)
+            db = (pb < 1.0).astype(np.int64)
+        else:
+            da = (rng.random(n) >= pa).astype(np.int64)
+            db = (rng.random(n) >= pb).astype(np.int64)
+        joint = (da << 1) | db
+        score_a += PAYOFF[joint]
+        score_b += PAYOFF[SWAP[joint]]
+        ha = ((ha << 2) | joint) & mask
+        hb = ((hb << 2) | SWAP[joint]) & mask
+
+    return score_a, score_b
+
+
+def play_matches(strategy_a, strategy_b, rounds=200, matches=1000, seed=None):
+    """Play `matches` independent matches of one pairing in parallel."""
+    memory, tables, initial = stack_tables([strategy_a, strategy_b])
+    init_a = np.full(matches, initial[0])
+    init_b = np.full(matches, initial[1])
+    return play_tables(tables[:1], init_a, tables[1:], init_b, memory, rounds,
+                       np.random.default_rng(seed))
+
+
+def reference_scores(strategy_a, strategy_b, rounds=200, matches=100, seed=None):
+    """Scores of the same matches played by the object-based reference engine."""
+    random.seed(seed)
+    # every round is played, no cycle skipping: this is what the engines are checked against
+    scores = [play_match(strategy_a, strategy_b, rounds, detect_cycles=False) for _ in range(matches)]
+    return np.array(scores, dtype=np.int64).T
+
+
+def check_equivalence(strategy_a, strategy_b, rounds=200, matches=200, seed=0, tolerance=0.05):
+    """Compare the NumPy engine with the reference engine on one pairing.
+
+    Deterministic pairings must give identical scores. Stochastic ones are
+    compared on the mean score per round, within `tolerance` relative error.
+    """
+    ref_a, ref_b = reference_scores(strategy_a, strategy_b, rounds, matches, seed)
+    vec_a, vec_b = play_matches(strategy_a, strategy_b, rounds, matches, seed)
+    if compile_strategy(strategy_a).is_deterministic() and compile_strategy(strategy_b).is_deterministic():
+        return bool((ref_a == vec_a).all() and (ref_b == vec_b).all())
+    for ref, vec in ((ref_a, vec_a), (ref_b, vec_b)):
+        if abs(ref.mean() - vec.mean()) > tolerance * max(ref.mean(), 1):
+            return False
+    return True
+
+
+if __name__ == '__main__':
+    rounds, matches = 200, 10000
+    rates = [0.0, 0.1, 0.5]
+
+    mismatches = 0
+    for rate_a in rates:
+        for rate_b in rates:
+            a = TitForTatWithForgiveness(rate_a)
+            b = TitForTatWithForgiveness(rate_b)
+            ok = check_equivalence(a, b, rounds)
+            mismatches += not ok
+            print(f'forgiveness {rate_a:.1f} vs {rate_b:.1f}: {"match" if ok else "MISMATCH"}')
+    if mismatches:
+        sys.exit(f'{mismatches} pairings differ between the engines')
+
+    # deterministic memory-2 tables fall into cycles of different lengths;
+    # an odd round count leaves a partial cycle to play at the end
+    tables = np.random.default_rng(0).integers(0, 2, (6, 16)).astype(float)
+    pairings = [(TitForTatWithForgiveness(r), MemoryStrategy(0, [p])) for r in (0.0, 1.0) for p in (0.0, 1.0)]
+    pairings += [(MemoryStrategy(2, ta, 3), MemoryStrategy(2, tb, 9)) for ta, tb in zip(tables[::2], tables[1::2])]
+    pairings.append((TitForTatWithForgiveness(0.0), TitForTatWithForgiveness(0.3)))
+    failures = sum(not check_cycle_skipping(a, b, r) for a, b in pairings for r in (1, 199, 1000))
+    print(f'cycle skipping: {len(pairings) * 3 - failures}/{len(pairings) * 3} matches played in full agree')
+    if failures:
+        sys.exit(f'{failures} matches differ with cycle skipping')
+
+    a, b = TitForTatWithForgiveness(0.1), TitForTatWithForgiveness(0.3)
+
+    start = time.perf_counter()
+    reference_scores(a, b, rounds, 100)
+    ref_rate = rounds * 100 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    play_matches(a, b, rounds, matches)
+    vec_rate = rounds * matches / (time.perf_counter() - start)
+
+    print(f'reference engine: {ref_rate:,.0f} rounds/s')
+    print(f'numpy engine:     {vec_rate:,.0f} rounds/s')
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""Shared --profile support for the simulation scripts.
+
+With --profile the whole run is recorded with cProfile and the stats are
+written to a file (inspect them with `python -m pstats FILE`). Named phase
+timers such as `plan.astar` or `render.draw_grid` are summed as well and
+printed as a table at exit. When profiling is off, phase() returns a shared
+no-op context manager and timed() functions make one flag check per call.
+"""
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import time
+from collections import defaultdict
+
+_enabled = False
+_totals = defaultdict(float)
+_counts = defaultdict(int)
+_NULL = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled
+
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        _totals[self.name] += time.perf_counter() - self.start
+        _counts[self.name] += 1
+
+
+def phase(name):
+    """Context manager timing the named phase."""
+    return _Phase(name) if _enabled else _NULL
+
+
+def timed(name):
+    """Decorator timing every call of a function as the named phase."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _totals[name] += time.perf_counter() - start
+                _counts[name] += 1
+        return wrapper
+    return decorate
+
+
+def add_profile_argument(parser, default_file='profile.prof'):
+    parser.add_argument('--profile', nargs='?', const=default_file, metavar='FILE',
+                        help=f'profile the run, write cProfile stats to FILE (default {default_file}) '
+                             'and print phase timings at exit')
+
+
+def enable(stats_file):
+    """Start cProfile and the phase timers; results are written at interpreter exit."""
+    global _enabled
+    _enabled = True
+    profiler = cProfile.Profile()
+    atexit.register(_finish, profiler, stats_file, time.perf_counter())
+    profiler.enable()
+
+
+def enable_from_args(args):
+    if getattr(args, 'profile', None):
+        enable(args.profile)
+
+
+def report(wall_time=None):
+    """Print the phase timers as a table, slowest first."""
+    print(f'\n{"phase":28} {"calls":>10} {"total ms":>12} {"mean us":>10} {"% wall":>7}')
+    for name, total in sorted(_totals.items(), key=lambda item: item[1], reverse=True):
+        count = _counts[name]
+        share = f'{100 * total / wall_time:6.1f}%' if wall_time else ''
+        print(f'{name:28} {count:10} {1000 * total:12.2f} {1e6 * total / count:10.1f} {share:>7}')
+    if wall_time:
+        print(f'{"wall":28} {"":10} {1000 * wall_time:12.2f}')
+
+
+def _finish(profiler, stats_file, started):
+    profiler.disable()
+    wall_time = time.perf_counter() - started
+    profiler.dump_stats(stats_file)
+    report(wall_time)
+    print(f'cProfile stats written to {stats_file}')
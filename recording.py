@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""Offscreen recording of pygame runs.
+
+FrameRecorder copies the pixels of a Surface for every frame and hands them
+to a background thread, which encodes an animated GIF (needs Pillow) or
+writes a numbered PNG sequence into a directory. Nothing is shown on screen
+and nothing waits: a wait only sets how long the last frame is displayed.
+"""
+
+import os
+import queue
+import threading
+
+import pygame
+
+
+class FrameRecorder:
+    def __init__(self, path, frame_ms=200, max_pending=256):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.gif = path.lower().endswith('.gif')
+        if self.gif:
+            from PIL import Image  # optional dependency, only needed for GIF output
+            self._image = Image
+        else:
+            os.makedirs(path, exist_ok=True)
+        self.frames = 0
+        self.size = None
+        self._last = None      # newest frame, kept until its duration is known
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def add_frame(self, surface):
+        """Capture the surface as the next frame, shown for frame_ms unless hold() changes it."""
+        self._flush()
+        self.size = surface.get_size()
+        self._last = [pygame.image.tobytes(surface, 'RGB'), self.frame_ms]
+
+    def hold(self, ms):
+        """Show the last frame for `ms` milliseconds (what pygame.time.wait did live)."""
+        if self._last is not None:
+            self._last[1] = ms
+
+    def _flush(self):
+        if self._last is not None:
+            self._queue.put((self._last[0], self._last[1]))
+            self._last = None
+            self.frames += 1
+
+    def close(self):
+        """Wait for the writer thread to finish the file(s)."""
+        self._flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error:
+            raise self._error
+
+    def _write(self):
+        # errors are kept for close(); the queue is drained regardless so
+        # add_frame() never blocks on a dead writer
+        images, durations = [], []
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error:
+                continue
+            pixels, duration = item
+            try:
+                if self.gif:
+                    image = self._image.frombytes('RGB', self.size, pixels)
+                    images.append(image.quantize(colors=64))
+                else:
+                    frame = pygame.image.frombytes(pixels, self.size, 'RGB')
+                    pygame.image.save(frame, os.path.join(self.path, f'frame_{len(durations):05d}.png'))
+                durations.append(duration)
+            except Exception as error:
+                self._error = error
+        if self._error:
+            return
+        try:
+            if self.gif and images:
+                images[0].save(self.path, save_all=True, append_images=images[1:],
+                               duration=durations, loop=0)
+            elif not self.gif:
+                with open(os.path.join(self.path, 'durations.txt'), 'w') as f:
+                    f.writelines(f'{d}\n' for d in durations)
+        except Exception as error:
+            self._error = error
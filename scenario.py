@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+"""Scenario files for the gold and cleaning grids.
+
+A scenario file is a little-endian header followed by the grid, one byte
+per cell, row after row:
+
+    magic b'GSCN', version, height, width, depot x, depot y, robot count
+    robot starts as (x, y) pairs
+    height * width cell bytes ('.', 'G', '#')
+
+load_scenario() maps the file with mmap and its grid reads straight from
+the mapping: grid[x] is a row view over the mapped bytes and grid[x][y]
+returns the cell as a one-character string, so astar(), get_neighbors()
+and the simulations use it like the usual list of lists. The mapping is
+copy-on-write, so robots picking up gold never change the file.
+
+A pack file holds many scenarios and an index of (offset, size) entries
+so any one of them can be opened without reading the others. The index
+comes last, so packs are written in one streaming pass:
+
+    magic b'GPAK', version, count, index offset
+    scenario bodies
+    count * (offset, size)
+"""
+
+import argparse
+import mmap
+import random
+import struct
+
+SCENARIO_MAGIC = b'GSCN'
+PACK_MAGIC = b'GPAK'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHHHHH')   # magic, version, height, width, depot x, depot y, robots
+POSITION = struct.Struct('<HH')
+PACK_HEADER = struct.Struct('<4sHxxQQ')  # magic, version, count, index offset
+PACK_ENTRY = struct.Struct('<QQ')       # offset, size
+
+
+class GridRow:
+    """One row of a mapped grid; cells read and write as one-character strings."""
+    __slots__ = ('cells',)
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, y):
+        return chr(self.cells[y])
+
+    def __setitem__(self, y, value):
+        self.cells[y] = ord(value)
+
+    def __iter__(self):
+        return (chr(c) for c in self.cells)
+
+
+class ScenarioGrid:
+    """Grid indexed as grid[x][y] over a flat buffer of cell bytes, without copying it."""
+
+    def __init__(self, cells, height, width):
+        self.cells = cells
+        self.height = height
+        self.width = width
+        # row views share the buffer; built once so lookups stay cheap
+        self.rows = [GridRow(cells[x * width:(x + 1) * width]) for x in range(height)]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, x):
+        return self.rows[x]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class Scenario:
+    def __init__(self, grid, depot, robots):
+        self.grid = grid
+        self.depot = tuple(depot)
+        self.robots = [tuple(r) for r in robots]
+
+    @property
+    def size(self):
+        return len(self.grid), len(self.grid[0])
+
+    def to_bytes(self):
+        height, width = self.size
+        if isinstance(self.grid, ScenarioGrid):
+            body = bytes(self.grid.cells)
+        else:
+            body = ''.join(''.join(row) for row in self.grid).encode('ascii')
+        header = HEADER.pack(SCENARIO_MAGIC, VERSION, height, width, *self.depot, len(self.robots))
+        return header + b''.join(POSITION.pack(*r) for r in self.robots) + body
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def from_buffer(cls, buffer, offset=0):
+        """Scenario whose grid is a view into `buffer` starting at `offset`."""
+        magic, version, height, width, dx, dy, count = HEADER.unpack_from(buffer, offset)
+        if magic != SCENARIO_MAGIC or version != VERSION:
+            raise ValueError("not a scenario (or an unsupported version)")
+        offset += HEADER.size
+        robots = [POSITION.unpack_from(buffer, offset + i * POSITION.size) for i in range(count)]
+        offset += count * POSITION.size
+        cells = memoryview(buffer)[offset:offset + height * width]
+        if len(cells) != height * width:
+            raise ValueError("scenario grid is truncated")
+        return cls(ScenarioGrid(cells, height, width), (dx, dy), robots)
+
+
+def _map(path):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+def load_scenario(path, index=None):
+    """Map a scenario file, or scenario `index` of a pack file."""
+    mapped = _map(path)
+    if mapped[:4] == PACK_MAGIC:
+        return ScenarioPack(path, mapped)[index or 0]
+    if index:
+        raise ValueError(f"{path} holds a single scenario")
+    return Scenario.from_buffer(mapped)
+
+
+class ScenarioPack:
+    """Random access to the scenarios of a pack file."""
+
+    def __init__(self, path, mapped=None):
+        self.path = path
+        self.mapped = mapped if mapped is not None else _map(path)
+        magic, version, self.count, self.index_offset = PACK_HEADER.unpack_from(self.mapped)
+        if magic != PACK_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a scenario pack (or an unsupported version)")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("scenario index out of range")
+        offset, size = PACK_ENTRY.unpack_from(self.mapped, self.index_offset + index * PACK_ENTRY.size)
+        return Scenario.from_buffer(memoryview(self.mapped)[offset:offset + size])
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+
+def write_pack(path, scenarios):
+    """Write scenarios (any iterable, consumed once) to a pack file; returns the count."""
+    entries = []
+    offset = PACK_HEADER.size
+    with open(path, 'wb') as f:
+        f.seek(offset)
+        for scenario in scenarios:
+            data = scenario.to_bytes()
+            f.write(data)
+            entries.append((offset, len(data)))
+            offset += len(data)
+        f.write(b''.join(PACK_ENTRY.pack(*entry) for entry in entries))
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, VERSION, len(entries), offset))
+    return len(entries)
+
+
+def random_scenario(kind, grid_size, items=5, obstacles=10):
+    """A random gold (depot at the centre) or cleaning (burner at the centre) scenario."""
+    if kind == 'gold':
+        import Collect_Gold_RV
+        centre = (grid_size // 2, grid_size // 2)
+        grid = Collect_Gold_RV.setup_environment(grid_size, items, obstacles, depot=centre)
+        return Scenario(grid, centre, [centre])
+    import Cleaning_Robots
+    grid = Cleaning_Robots.setup_environment(grid_size, items)
+    return Scenario(grid, (grid_size // 2, grid_size // 2), [(0, 0)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or inspect scenario files.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help='write random scenarios (a pack if --count > 1)')
+    generate.add_argument('path')
+    generate.add_argument('--kind', choices=['gold', 'cleaning'], default='gold')
+    generate.add_argument('--count', type=int, default=1)
+    generate.add_argument('--grid-size', type=int, default=9)
+    generate.add_argument('--items', type=int, default=5, help='gold or garbage per scenario')
+    generate.add_argument('--obstacles', type=int, default=10)
+    generate.add_argument('--seed', type=int, default=0)
+    show = commands.add_parser('show', help='print a scenario')
+    show.add_argument('path')
+    show.add_argument('--index', type=int, help='scenario to show from a pack')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        random.seed(args.seed)
+        scenarios = (random_scenario(args.kind, args.grid_size, args.items, args.obstacles)
+                     for _ in range(args.count))
+        if args.count == 1:
+            next(scenarios).save(args.path)
+        else:
+            write_pack(args.path, scenarios)
+        print(f"Wrote {args.count} {args.kind} scenario(s) to {args.path}")
+    else:
+        scenario = load_scenario(args.path, args.index)
+        height, width = scenario.size
+        print(f"{height}x{width} grid, depot {scenario.depot}, robots {scenario.robots}")
+        for row in scenario.grid:
+            print(' '.join(row))